@@ -3,86 +3,140 @@
 import os
 import asyncio
 import secrets
-import traceback
 import uvicorn
-import re
 import logging
 from contextlib import asynccontextmanager
 
 from pyrogram import Client, filters, enums
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, ChatMemberUpdated
 from pyrogram.errors import FloodWait, UserNotParticipant
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-from pyrogram.file_id import FileId
-from pyrogram import raw
-from pyrogram.session import Session, Auth
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-import math
+from fastapi.responses import JSONResponse
 
 # Project ki dusri files se important cheezein import karo
 from config import Config
 from database import db
+from cache import chunk_cache
+from cluster import registry, owns_client
+from ingest import IngestQueue
+from streaming import router, scheduler, session_pool, multi_clients, add_client, initialize_clients, get_media_meta
+from streaming.fanout import broadcaster
+import metrics
 
 # =====================================================================================
 # --- SETUP: BOT, WEB SERVER, AUR LOGGING ---
 # =====================================================================================
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Yeh function bot ko web server ke saath start aur stop karta hai.
-    """
-    print("--- Lifespan: Server chalu ho raha hai... ---")
-    
+# Startup ke har hisse ka haal (/ready isi ko dikhata hai)
+readiness = {"database": False, "chunk_cache": False, "bot": False, "storage_channel": False, "cleanup": "pending"}
+background_tasks = set()
+
+def run_in_background(coro):
+    """ Task ko background mein chalata hai aur uska reference rakhta hai (taaki GC na ho aur shutdown par cancel ho). """
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+async def boot_database():
     await db.connect()
-    
-    try:
-        print("Starting main Pyrogram bot...")
-        await bot.start()
-        
-        me = await bot.get_me()
-        Config.BOT_USERNAME = me.username
-        print(f"✅ Main Bot [@{Config.BOT_USERNAME}] safaltapoorvak start ho gaya.")
-
-        # --- MULTI-CLIENT STARTUP ---
-        multi_clients[0] = bot
-        work_loads[0] = 0
-        await initialize_clients()
-        
-        print(f"Verifying storage channel ({Config.STORAGE_CHANNEL})...")
-        await bot.get_chat(Config.STORAGE_CHANNEL)
-        print("✅ Storage channel accessible hai.")
+    readiness["database"] = True
 
-        if Config.FORCE_SUB_CHANNEL:
-            try:
-                print(f"Verifying force sub channel ({Config.FORCE_SUB_CHANNEL})...")
-                await bot.get_chat(Config.FORCE_SUB_CHANNEL)
-                print("✅ Force Sub channel accessible hai.")
-            except Exception as e:
-                print(f"!!! WARNING: Bot, Force Sub channel mein admin nahi hai. Error: {e}")
-        
+async def boot_chunk_cache():
+    await chunk_cache.load()
+    readiness["chunk_cache"] = True
+
+async def boot_bot():
+    print("Starting main Pyrogram bot...")
+    await bot.start()
+
+    me = await bot.get_me()
+    Config.BOT_USERNAME = me.username
+    print(f"✅ Main Bot [@{Config.BOT_USERNAME}] safaltapoorvak start ho gaya.")
+
+    # --- MULTI-CLIENT STARTUP ---
+    await add_client(0, bot)
+    readiness["bot"] = True
+
+    if Config.FORCE_SUB_CHANNEL and Config.ROLE != "stream":
         try:
-            await cleanup_channel(bot)
+            print(f"Verifying force sub channel ({Config.FORCE_SUB_CHANNEL})...")
+            await bot.get_chat(Config.FORCE_SUB_CHANNEL)
+            print("✅ Force Sub channel accessible hai.")
         except Exception as e:
-            print(f"Warning: Channel cleanup fail ho gaya. Error: {e}")
+            print(f"!!! WARNING: Bot, Force Sub channel mein admin nahi hai. Error: {e}")
 
-        print("--- Lifespan: Startup safaltapoorvak poora hua. ---")
-    
+async def run_cleanup():
+    readiness["cleanup"] = "running"
+    try:
+        await cleanup_channel(bot)
+        readiness["cleanup"] = "done"
     except Exception as e:
-        print(f"!!! FATAL ERROR: Bot startup ke dauraan error aa gaya: {traceback.format_exc()}")
+        readiness["cleanup"] = "failed"
+        print(f"Warning: Channel cleanup fail ho gaya. Error: {e}")
+
+async def boot():
+    """
+    Startup: database, chunk cache, main bot aur extra clients ek saath start hote hain.
+    Server pehle se requests le raha hota hai; jo client ready ho jaaye woh turant /dl serve karne lagta hai.
+    """
+    print(f"Role: {Config.ROLE} (worker {Config.WORKER_INDEX}/{Config.WORKER_COUNT})")
+    steps = {"database": boot_database(), "chunk_cache": boot_chunk_cache()}
+    if owns_client(0):
+        steps["bot"] = boot_bot()
+    if Config.ROLE != "bot":
+        steps["clients"] = initialize_clients(owns_client)
+    results = await asyncio.gather(*steps.values(), return_exceptions=True)
+    for name, result in zip(steps, results):
+        if isinstance(result, Exception):
+            readiness[name] = f"failed: {result}"
+            print(f"!!! FATAL ERROR: Startup step '{name}' fail ho gaya: {result!r}")
+
+    session_pool.start(multi_clients)
+    registry.start(node_state)
+    if Config.ROLE != "stream":
+        ingest_queue.start()
+
+    if multi_clients:
+        try:
+            print(f"Verifying storage channel ({Config.STORAGE_CHANNEL})...")
+            await next(iter(multi_clients.values())).get_chat(Config.STORAGE_CHANNEL)
+            readiness["storage_channel"] = True
+            print("✅ Storage channel accessible hai.")
+        except Exception as e:
+            print(f"!!! WARNING: Storage channel accessible nahi hai. Error: {e}")
+
+    # Force-sub aur channel cleanup bot node ka kaam hai; cleanup lamba chal sakta hai, isliye background mein
+    if Config.ROLE != "stream" and readiness["bot"] is True:
+        run_in_background(run_cleanup())
+    else:
+        readiness["cleanup"] = "skipped"
+
+    print("--- Lifespan: Startup safaltapoorvak poora hua. ---")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Yeh function bot ko web server ke saath start aur stop karta hai.
+    Startup background mein hota hai taaki server turant requests lene lage (haal /ready par).
+    """
+    print("--- Lifespan: Server chalu ho raha hai... ---")
+    run_in_background(boot())
     
     yield
     
     print("--- Lifespan: Server band ho raha hai... ---")
+    for task in list(background_tasks):
+        task.cancel()
+    session_pool.stop()
+    registry.stop()
+    await ingest_queue.stop()
     if bot.is_initialized:
         await bot.stop()
     print("--- Lifespan: Shutdown poora hua. ---")
 
 app = FastAPI(lifespan=lifespan)
-templates = Jinja2Templates(directory="templates")
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -90,6 +144,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Streaming routes (/show, /api/file, /dl, /stream, /seg, /metrics, /api/clients) streaming package se
+app.include_router(router)
 
 # --- LOG FILTER: YEH SIRF /dl/ WALE LOGS KO CHUPAYEGA ---
 class HideDLFilter(logging.Filter):
@@ -101,88 +157,8 @@ class HideDLFilter(logging.Filter):
 logging.getLogger("uvicorn.access").addFilter(HideDLFilter())
 # --- FIX KHATAM ---
 
-bot = Client("SimpleStreamBot", api_id=Config.API_ID, api_hash=Config.API_HASH, bot_token=Config.BOT_TOKEN, in_memory=True)
-multi_clients = {}; work_loads = {}; class_cache = {}
-
-# =====================================================================================
-# --- MULTI-CLIENT LOGIC ---
-# =====================================================================================
-
-class TokenParser:
-    """ Environment variables se MULTI_TOKENs ko parse karta hai. """
-    @staticmethod
-    def parse_from_env():
-        return {
-            c + 1: t
-            for c, (_, t) in enumerate(
-                filter(lambda n: n[0].startswith("MULTI_TOKEN"), sorted(os.environ.items()))
-            )
-        }
-
-async def start_client(client_id, bot_token):
-    """ Ek naye client bot ko start karta hai. """
-    try:
-        print(f"Attempting to start Client: {client_id}")
-        client = await Client(
-            name=str(client_id), 
-            api_id=Config.API_ID, 
-            api_hash=Config.API_HASH,
-            bot_token=bot_token, 
-            no_updates=True, 
-            in_memory=True
-        ).start()
-        work_loads[client_id] = 0
-        multi_clients[client_id] = client
-        print(f"✅ Client {client_id} started successfully.")
-    except Exception as e:
-        print(f"!!! CRITICAL ERROR: Failed to start Client {client_id} - Error: {e}")
-
-async def initialize_clients():
-    """ Saare additional clients ko initialize karta hai. """
-    all_tokens = TokenParser.parse_from_env()
-    if not all_tokens:
-        print("No additional clients found. Using default bot only.")
-        return
-    
-    print(f"Found {len(all_tokens)} extra clients. Starting them...")
-    tasks = [start_client(i, token) for i, token in all_tokens.items()]
-    await asyncio.gather(*tasks)
-
-    if len(multi_clients) > 1:
-        print(f"✅ Multi-Client Mode Enabled. Total Clients: {len(multi_clients)}")
-
-# =====================================================================================
-# --- HELPER FUNCTIONS ---
-# =====================================================================================
-
-def get_readable_file_size(size_in_bytes):
-    if not size_in_bytes:
-        return '0B'
-    power = 1024
-    n = 0
-    power_labels = {0: 'B', 1: 'KB', 2: 'MB', 3: 'GB'}
-    while size_in_bytes >= power and n < len(power_labels) - 1:
-        size_in_bytes /= power
-        n += 1
-    return f"{size_in_bytes:.2f} {power_labels[n]}"
-
-def mask_filename(name: str):
-    if not name:
-        return "Protected File"
-    base, ext = os.path.splitext(name)
-    metadata_pattern = re.compile(
-        r'((19|20)\d{2}|4k|2160p|1080p|720p|480p|360p|HEVC|x265|BluRay|WEB-DL|HDRip)',
-        re.IGNORECASE
-    )
-    match = metadata_pattern.search(base)
-    if match:
-        title_part = base[:match.start()].strip(' .-_')
-        metadata_part = base[match.start():]
-    else:
-        title_part = base
-        metadata_part = ""
-    masked_title = ''.join(c if (i % 3 == 0 and c.isalnum()) else ('*' if c.isalnum() else c) for i, c in enumerate(title_part))
-    return f"{masked_title} {metadata_part}{ext}".strip()
+# ROLE=stream workers updates poll nahi karte: updates sirf ek bot node handle karta hai
+bot = Client("SimpleStreamBot", api_id=Config.API_ID, api_hash=Config.API_HASH, bot_token=Config.BOT_TOKEN, in_memory=True, no_updates=Config.ROLE == "stream")
 
 # =====================================================================================
 # --- PYROGRAM BOT HANDLERS ---
@@ -229,22 +205,87 @@ __Just Send Or Forward Any File To Me And I will instantly give you a special li
 """
         await message.reply_text(reply_text)
 
-async def handle_file_upload(message: Message, user_id: int):
-    try:
-        sent_message = await message.copy(chat_id=Config.STORAGE_CHANNEL)
-        unique_id = secrets.token_urlsafe(8)
-        await db.save_link(unique_id, sent_message.id)
-        
-        verify_link = f"https://t.me/{Config.BOT_USERNAME}?start=verify_{unique_id}"
+async def prepare_upload(message: Message):
+    """
+    File ka link document (aur kya woh naya hai) deta hai. Yahi file (same file_unique_id) pehle upload ho chuki ho
+    toh copy nahi hoti, purana link hi lauta diya jaata hai.
+    """
+    meta = get_media_meta(message) or {}
+    existing = await db.get_link_by_media(meta.get('file_unique_id'))
+    if existing is not None:
+        metrics.CACHE_REQUESTS.inc("upload_dedup", "hit")
+        return existing, False
+    metrics.CACHE_REQUESTS.inc("upload_dedup", "miss")
+    sent_message = await message.copy(chat_id=Config.STORAGE_CHANNEL)
+    meta = get_media_meta(sent_message) or {}
+    doc = {'_id': secrets.token_urlsafe(8), 'message_id': sent_message.id, **meta}
+    if meta.get('file_unique_id'):
+        doc['media_key'] = meta['file_unique_id']
+    return doc, True
+
+async def discard_upload(doc: dict):
+    """ Dedup race mein haari hui faaltu copy ko storage channel se hatata hai. """
+    await bot.delete_messages(Config.STORAGE_CHANNEL, doc['message_id'])
+
+async def reply_uploads(user_id: int, done: list, failed: list):
+    """ User ki saari upload hui files ka ek hi reply. """
+    if len(done) == 1 and not failed:
+        message, doc = done[0]
+        verify_link = f"https://t.me/{Config.BOT_USERNAME}?start=verify_{doc['_id']}"
         button = InlineKeyboardMarkup([[InlineKeyboardButton("Get Link Now", url=verify_link)]])
-        
-        await message.reply_text("__✅ File Uploaded!__", reply_markup=button, quote=True)
-    except Exception as e:
-        print(f"!!! ERROR: {traceback.format_exc()}"); await message.reply_text("Sorry, something went wrong.")
+        return await message.reply_text("__✅ File Uploaded!__", reply_markup=button, quote=True)
+    # Plain text: file names mein `[`, `_`, `*` jaise characters markdown tod dete; link apni line par
+    lines = [f"✅ {len(done)} Files Uploaded!" if done else "Sorry, something went wrong."]
+    for i, (message, doc) in enumerate(done, 1):
+        name = doc.get('file_name') or f"File {i}"
+        lines.append(f"{i}. {name}\nhttps://t.me/{Config.BOT_USERNAME}?start=verify_{doc['_id']}")
+    if failed and done:
+        lines.append(f"\n{len(failed)} file(s) could not be uploaded. Please send them again.")
+    # Telegram message 4096 characters tak hi; lambi list ko kai messages mein bhejo
+    chunk = ""
+    for line in lines:
+        if len(chunk) + len(line) + 1 > 4000:
+            await bot.send_message(user_id, chunk, parse_mode=enums.ParseMode.DISABLED, disable_web_page_preview=True)
+            chunk = ""
+        chunk += line + "\n"
+    if chunk:
+        await bot.send_message(user_id, chunk, parse_mode=enums.ParseMode.DISABLED, disable_web_page_preview=True)
+
+ingest_queue = IngestQueue(prepare_upload, reply_uploads, discard_upload)
 
 @bot.on_message(filters.private & (filters.document | filters.video | filters.audio))
 async def file_handler(_, message: Message):
-    await handle_file_upload(message, message.from_user.id)
+    if not ingest_queue.submit(message.from_user.id, message):
+        await message.reply_text("__Your upload queue is full. Please wait for your previous files to finish.__", quote=True)
+
+@bot.on_message(filters.command("backfill") & filters.private & filters.user(Config.OWNER_ID))
+async def backfill_command(client: Client, message: Message):
+    """ Purane links mein file metadata bharta hai taaki /api/file aur /dl Telegram ko touch na karein. """
+    if not Config.FILE_META_PERSIST:
+        return await message.reply_text("__FILE_META_PERSIST is disabled, so there is nothing to backfill.__", quote=True)
+    status = await message.reply_text("__Starting backfill...__", quote=True)
+    done = failed = 0
+    failed_ids = set()
+    while True:
+        docs = await db.get_links_without_meta(exclude=failed_ids, limit=200)
+        if not docs:
+            break
+        ids = sorted({d['message_id'] for d in docs})
+        try:
+            msgs = await client.get_messages(Config.STORAGE_CHANNEL, ids)
+        except FloodWait as e:
+            await asyncio.sleep(e.value)
+            continue
+        for msg in msgs:
+            meta = get_media_meta(msg)
+            if meta:
+                await db.save_file_meta(msg.id, meta)
+                done += 1
+            else:
+                failed_ids.add(msg.id)
+                failed += 1
+        await status.edit_text(f"__Backfill: {done} updated, {failed} skipped...__")
+    await status.edit_text(f"__✅ Backfill complete: {done} updated, {failed} skipped.__")
 
 @bot.on_chat_member_updated(filters.chat(Config.STORAGE_CHANNEL))
 async def simple_gatekeeper(c: Client, m_update: ChatMemberUpdated):
@@ -277,96 +318,66 @@ async def health_check():
     """
     return {"status": "ok", "message": "Server is healthy and running!"}
 
-@app.get("/show/{unique_id}", response_class=HTMLResponse)
-async def show_page(request: Request, unique_id: str):
-    return templates.TemplateResponse(
-        "show.html",
-        {"request": request}
-    )
-
-@app.get("/api/file/{unique_id}", response_class=JSONResponse)
-async def get_file_details_api(request: Request, unique_id: str):
-    message_id = await db.get_link(unique_id)
-    if not message_id:
-        raise HTTPException(status_code=404, detail="Link expired or invalid.")
-    main_bot = multi_clients.get(0)
-    if not main_bot:
-        raise HTTPException(status_code=503, detail="Bot is not ready.")
-    try:
-        message = await main_bot.get_messages(Config.STORAGE_CHANNEL, message_id)
-    except Exception:
-        raise HTTPException(status_code=404, detail="File not found on Telegram.")
-    media = message.document or message.video or message.audio
-    if not media:
-        raise HTTPException(status_code=404, detail="Media not found in the message.")
-    file_name = media.file_name or "file"
-    safe_file_name = "".join(c for c in file_name if c.isalnum() or c in (' ', '.', '_', '-')).rstrip()
-    mime_type = media.mime_type or "application/octet-stream"
-    response_data = {
-        "file_name": mask_filename(file_name),
-        "file_size": get_readable_file_size(media.file_size),
-        "is_media": mime_type.startswith(("video", "audio")),
-        "direct_dl_link": f"{Config.BASE_URL}/dl/{message_id}/{safe_file_name}",
-        "mx_player_link": f"intent:{Config.BASE_URL}/dl/{message_id}/{safe_file_name}#Intent;action=android.intent.action.VIEW;type={mime_type};end",
-        "vlc_player_link": f"intent:{Config.BASE_URL}/dl/{message_id}/{safe_file_name}#Intent;action=android.intent.action.VIEW;type={mime_type};package=org.videolan.vlc;end"
+def is_ready() -> bool:
+    """
+    Kya yeh node apna kaam kar sakta hai: stream node ko koi client chahiye, bot node ko bot aur database,
+    aur ROLE=all ko client aur database dono (woh /show bhi serve karta hai).
+    """
+    database = readiness["database"] is True or not Config.DATABASE_URL
+    if Config.ROLE == "bot":
+        return readiness["bot"] is True and database
+    if Config.ROLE == "all":
+        return bool(multi_clients) and database
+    return bool(multi_clients)
+
+@app.get("/ready")
+async def readiness_check():
+    """ Readiness (liveness `/` se alag): har startup hisse ka haal; taiyaar na ho toh 503. """
+    body = dict(readiness, ready=is_ready(), serving_clients=sorted(multi_clients))
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+def node_state() -> dict:
+    """ Cluster heartbeat ke liye is worker ka haal: clients, load aur kaunsi files hot/cached hain. """
+    states = scheduler.clients.values()
+    return {
+        "clients": sorted(multi_clients),
+        "active_streams": sum(s.streams for s in states),
+        "throughput_bps": round(sum(s.throughput for s in states)),
+        "hot_files": sorted(set(broadcaster.viewers) | set(chunk_cache.media_ids(100))),
     }
-    return response_data
-
-class ByteStreamer:
-    def __init__(self,c:Client):self.client=c
-    @staticmethod
-    async def get_location(f:FileId): return raw.types.InputDocumentFileLocation(id=f.media_id,access_hash=f.access_hash,file_reference=f.file_reference,thumb_size=f.thumbnail_size)
-    async def yield_file(self,f:FileId,i:int,o:int,fc:int,lc:int,pc:int,cs:int):
-        c=self.client;work_loads[i]+=1;ms=c.media_sessions.get(f.dc_id)
-        if ms is None:
-            if f.dc_id!=await c.storage.dc_id():
-                ak=await Auth(c,f.dc_id,await c.storage.test_mode()).create();ms=Session(c,f.dc_id,ak,await c.storage.test_mode(),is_media=True);await ms.start();ea=await c.invoke(raw.functions.auth.ExportAuthorization(dc_id=f.dc_id));await ms.invoke(raw.functions.auth.ImportAuthorization(id=ea.id,bytes=ea.bytes))
-            else:ms=c.session
-            c.media_sessions[f.dc_id]=ms
-        loc=await self.get_location(f);cp=1
-        try:
-            while cp<=pc:
-                r=await ms.invoke(raw.functions.upload.GetFile(location=loc,offset=o,limit=cs),retries=0)
-                if isinstance(r,raw.types.upload.File):
-                    chk=r.bytes
-                    if not chk:break
-                    if pc==1:yield chk[fc:lc]
-                    elif cp==1:yield chk[fc:]
-                    elif cp==pc:yield chk[:lc]
-                    else:yield chk
-                    cp+=1;o+=cs
-                else:break
-        finally:work_loads[i]-=1
-
-@app.get("/dl/{mid}/{fname}")
-async def stream_media(r:Request,mid:int,fname:str):
-    if not work_loads: raise HTTPException(503)
-    client_id = min(work_loads, key=work_loads.get)
-    c = multi_clients.get(client_id)
-    if not c: raise HTTPException(503)
-    
-    tc=class_cache.get(c) or ByteStreamer(c);class_cache[c]=tc
-    try:
-        msg=await c.get_messages(Config.STORAGE_CHANNEL,mid);m=msg.document or msg.video or msg.audio
-        if not m or msg.empty:raise FileNotFoundError
-        fid=FileId.decode(m.file_id);fsize=m.file_size;rh=r.headers.get("Range","");fb,ub=0,fsize-1
-        if rh:
-            rps=rh.replace("bytes=","").split("-");fb=int(rps[0])
-            if len(rps)>1 and rps[1]:ub=int(rps[1])
-        if(ub>=fsize)or(fb<0):raise HTTPException(416)
-        rl=ub-fb+1;cs=1024*1024;off=(fb//cs)*cs;fc=fb-off;lc=(ub%cs)+1;pc=math.ceil(rl/cs)
-        body=tc.yield_file(fid,client_id,off,fc,lc,pc,cs);sc=206 if rh else 200
-        hdrs={"Content-Type":m.mime_type or "application/octet-stream","Accept-Ranges":"bytes","Content-Disposition":f'inline; filename="{m.file_name}"',"Content-Length":str(rl)}
-        if rh:hdrs["Content-Range"]=f"bytes {fb}-{ub}/{fsize}"
-        return StreamingResponse(body,status_code=sc,headers=hdrs)
-    except FileNotFoundError:raise HTTPException(404)
-    except Exception:print(traceback.format_exc());raise HTTPException(500)
+
+@app.get("/api/nodes", response_class=JSONResponse)
+async def nodes_status():
+    """ Cluster ke zinda nodes aur unka load (reverse proxy / bot node routing ke liye). """
+    return await registry.nodes()
 
 # =====================================================================================
 # --- MAIN EXECUTION BLOCK ---
 # =====================================================================================
 
+def serve_worker(sock, worker_index: int):
+    """ WEB_WORKERS mode ka ek child process: apna WORKER_INDEX le kar shared socket par serve karta hai. """
+    Config.WORKER_INDEX = worker_index
+    chunk_cache.partition(f"w{worker_index}", Config.WEB_WORKERS)
+    uvicorn.Server(uvicorn.Config("app:app", log_level="info")).run(sockets=[sock])
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
-    # Log level ko "info" rakho taaki hamara filter kaam kar sake
-    uvicorn.run("app:app", host="0.0.0.0", port=port, log_level="info")
+    workers = Config.WEB_WORKERS
+    if workers > 1 and Config.ROLE != "stream":
+        print("!!! WARNING: WEB_WORKERS sirf ROLE=stream ke saath chalta hai (warna bot duplicate poll karega). 1 worker use ho raha hai.")
+        workers = 1
+    if workers == 1:
+        # Log level ko "info" rakho taaki hamara filter kaam kar sake
+        uvicorn.run("app:app", host="0.0.0.0", port=port, log_level="info")
+    else:
+        import socket
+        import multiprocessing
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("0.0.0.0", port))
+        sock.set_inheritable(True)
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=serve_worker, args=(sock, Config.WORKER_INDEX + p)) for p in range(workers)]
+        for p in procs: p.start()
+        for p in procs: p.join()
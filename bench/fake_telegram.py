@@ -0,0 +1,112 @@
+# bench/fake_telegram.py (LOCAL STAND-IN FOR TELEGRAM CLIENTS)
+
+import asyncio
+import random
+import types
+from pyrogram import raw
+from pyrogram.errors import FloodWait
+from pyrogram.file_id import FileId, FileType
+
+PATTERN_PERIOD = 1024 * 1024 + 7  # 1 MB se thoda bada, taaki har part ka content alag ho
+
+class SyntheticFile:
+    """ Deterministic content wali nakli file: byte i = pattern[i % PATTERN_PERIOD]. """
+    _pattern = None
+
+    def __init__(self, media_id: int, size: int, mime_type: str = "video/mp4", name: str = None):
+        self.media_id = media_id
+        self.size = size
+        self.mime_type = mime_type
+        self.name = name or f"Synthetic Movie {media_id} 2024 1080p.mp4"
+        if SyntheticFile._pattern is None:
+            rnd = random.Random(42)
+            block = bytes(rnd.getrandbits(8) for _ in range(PATTERN_PERIOD))
+            SyntheticFile._pattern = block + block  # wrap-around slicing ke liye
+        self.pattern = SyntheticFile._pattern
+
+    def read(self, offset: int, limit: int) -> bytes:
+        end = min(offset + limit, self.size)
+        if offset >= end:
+            return b""
+        out = bytearray()
+        while offset < end:
+            start = offset % PATTERN_PERIOD
+            n = min(end - offset, PATTERN_PERIOD)
+            out += self.pattern[start:start + n]
+            offset += n
+        return bytes(out)
+
+class FakeSession:
+    """
+    `Session.invoke` ka stand-in: GetFile ko synthetic files se serve karta hai.
+    `latency` (seconds) har request par, `bandwidth` (bytes/sec, 0 = unlimited) per session,
+    aur `flood_rate` probability se FloodWait(`flood_seconds`) phenkta hai.
+    """
+    def __init__(self, files: dict, latency=0.05, bandwidth=0, flood_rate=0.0, flood_seconds=5, dc_id=2):
+        self.files = files
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.flood_rate = flood_rate
+        self.flood_seconds = flood_seconds
+        self.dc_id = dc_id
+        self.requests = 0
+        self._link_free_at = 0.0
+
+    async def invoke(self, query, retries=0, timeout=15, sleep_threshold=10):
+        self.requests += 1
+        if isinstance(query, raw.functions.Ping):
+            await asyncio.sleep(self.latency)
+            return raw.types.Pong(msg_id=0, ping_id=query.ping_id)
+        if not isinstance(query, raw.functions.upload.GetFile):
+            raise NotImplementedError(type(query).__name__)
+        if self.flood_rate and random.random() < self.flood_rate:
+            raise FloodWait(value=self.flood_seconds)
+        data = self.files[query.location.id].read(query.offset, query.limit)
+        delay = self.latency
+        if self.bandwidth:
+            # Ek session ki link serially share hoti hai: transfer time queue mein jodta hai
+            loop = asyncio.get_running_loop()
+            start = max(loop.time(), self._link_free_at)
+            self._link_free_at = start + len(data) / self.bandwidth
+            delay += self._link_free_at - loop.time()
+        await asyncio.sleep(delay)
+        return raw.types.upload.File(type=raw.types.storage.FilePartial(), mtime=0, bytes=data)
+
+    async def stop(self):
+        pass
+
+class _FakeStorage:
+    def __init__(self, dc_id):
+        self._dc_id = dc_id
+
+    async def dc_id(self):
+        return self._dc_id
+
+    async def test_mode(self):
+        return False
+
+class FakeClient:
+    """ Pyrogram `Client` ka utna hissa jitna streaming path use karta hai. """
+    def __init__(self, name: str, files: dict, dc_id=2, **session_kwargs):
+        self.name = name
+        self.files = files
+        self.storage = _FakeStorage(dc_id)
+        self.session = FakeSession(files, dc_id=dc_id, **session_kwargs)
+        self.media_sessions = {}
+        self.me = types.SimpleNamespace(id=hash(name) & 0xFFFF, username=f"fake_{name}")
+        self.get_messages_calls = 0
+
+    async def invoke(self, query, **kwargs):
+        return await self.session.invoke(query, **kwargs)
+
+    async def get_messages(self, chat_id, message_ids):
+        self.get_messages_calls += 1
+        await asyncio.sleep(self.session.latency)
+        f = self.files.get(message_ids)
+        if f is None:
+            return types.SimpleNamespace(empty=True, document=None, video=None, audio=None, id=message_ids, date=None)
+        file_id = FileId(file_type=FileType.DOCUMENT, dc_id=await self.storage.dc_id(), media_id=f.media_id,
+                         access_hash=f.media_id * 31, file_reference=b"bench").encode()
+        doc = types.SimpleNamespace(file_id=file_id, file_unique_id=f"bench{f.media_id}", file_size=f.size,
+                                    mime_type=f.mime_type, file_name=f.name)
+        return types.SimpleNamespace(empty=False, document=doc, video=None, audio=None, id=message_ids, date=None)
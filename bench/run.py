@@ -0,0 +1,204 @@
+# bench/run.py (STREAMING BENCHMARK)
+#
+# Asli bots ke bina streaming path naapne ke liye. Fake Telegram clients ke saath `streaming` package
+# ke routes (bot ke bina) local uvicorn par chalata hai aur /dl aur /api/file par concurrent workloads chalata hai.
+#
+#   python bench/run.py --clients 3 --concurrency 32 --workload seek --latency 0.08
+#
+# Report: throughput, TTFB (p50/p95/p99), requests/sec, errors, peak RSS aur Telegram requests.
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import resource
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault("STORAGE_CHANNEL", "-1001")
+os.environ.setdefault("SESSION_PREWARM", "false")
+os.environ.setdefault("SESSION_KEEPALIVE", "0")
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+import streaming
+from database import db
+from fake_telegram import FakeClient, SyntheticFile, PATTERN_PERIOD
+
+MB = 1024 * 1024
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Streamix streaming benchmark (fake Telegram backend)")
+    p.add_argument("--workload", choices=["sequential", "range", "seek", "api", "mixed"], default="mixed")
+    p.add_argument("--clients", type=int, default=1, help="fake bot clients in multi_clients")
+    p.add_argument("--files", type=int, default=4, help="synthetic files (hot set)")
+    p.add_argument("--file-mb", type=int, default=64)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--requests", type=int, default=200, help="total requests to issue")
+    p.add_argument("--latency", type=float, default=0.05, help="GetFile round trip (s)")
+    p.add_argument("--bandwidth-mb", type=float, default=0, help="per-session bandwidth MB/s (0 = unlimited)")
+    p.add_argument("--flood-rate", type=float, default=0.0, help="probability of FloodWait per GetFile")
+    p.add_argument("--flood-seconds", type=int, default=3)
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--output", help="append the report to this file (e.g. bench_output.txt)")
+    return p.parse_args()
+
+def install_fakes(args) -> dict:
+    files = {mid: SyntheticFile(mid, args.file_mb * MB) for mid in range(1, args.files + 1)}
+    links = {f"bench{mid}": {"_id": f"bench{mid}", "message_id": mid} for mid in files}
+
+    async def get_link_doc(unique_id):
+        return links.get(unique_id)
+
+    async def no_meta(message_id):
+        return None
+
+    async def ignore(*a, **k):
+        return None
+
+    db.get_link_doc = get_link_doc
+    db.get_file_meta = no_meta
+    db.save_file_meta = ignore
+
+    for i in range(args.clients):
+        c = FakeClient(str(i), files, latency=args.latency, bandwidth=args.bandwidth_mb * MB,
+                       flood_rate=args.flood_rate, flood_seconds=args.flood_seconds)
+        streaming.multi_clients[i] = c
+        streaming.scheduler.register(i, 2)
+    return files
+
+def verify(body: bytes, start: int) -> bool:
+    """ Sample bytes ko synthetic pattern se milata hai (ordering/cut math ki galti pakadne ke liye). """
+    pattern = SyntheticFile._pattern
+    for k in (0, len(body) // 2, len(body) - 1):
+        if k >= 0 and body and body[k] != pattern[(start + k) % PATTERN_PERIOD]:
+            return False
+    return True
+
+class Stats:
+    def __init__(self):
+        self.ttfb = []
+        self.bytes = 0
+        self.requests = 0
+        self.errors = 0
+        self.corrupt = 0
+
+async def fetch_range(http, stats, mid, size, start=None, end=None, read_limit=None):
+    headers = {}
+    if start is not None:
+        headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+    t0 = time.perf_counter()
+    try:
+        async with http.stream("GET", f"/dl/{mid}/bench.mp4", headers=headers) as r:
+            if r.status_code not in (200, 206):
+                stats.errors += 1
+                return
+            first = True
+            buf = bytearray()
+            async for chunk in r.aiter_raw():
+                if first:
+                    stats.ttfb.append(time.perf_counter() - t0)
+                    first = False
+                buf += chunk
+                if read_limit and len(buf) >= read_limit:
+                    break  # player ne seek kiya: connection beech mein chhod do
+            stats.bytes += len(buf)
+            if not verify(bytes(buf), start or 0):
+                stats.corrupt += 1
+    except httpx.HTTPError:
+        stats.errors += 1
+    finally:
+        stats.requests += 1
+
+async def one_request(http, stats, files, workload):
+    mid = random.choice(list(files))
+    size = files[mid].size
+    if workload == "mixed":
+        workload = random.choice(["sequential", "range", "seek", "api"])
+    if workload == "sequential":
+        await fetch_range(http, stats, mid, size)
+    elif workload == "range":
+        start = random.randrange(0, size - 1)
+        end = min(size - 1, start + random.randint(1, 8 * MB))
+        await fetch_range(http, stats, mid, size, start, end)
+    elif workload == "seek":
+        # Video player jaisa: header probe, moov atom probe (file ke end par), phir beech se padhna
+        await fetch_range(http, stats, mid, size, 0, 8191)
+        await fetch_range(http, stats, mid, size, size - 64 * 1024, size - 1)
+        await fetch_range(http, stats, mid, size, random.randrange(0, size // 2), None, read_limit=4 * MB)
+    elif workload == "api":
+        t0 = time.perf_counter()
+        r = await http.get(f"/api/file/bench{mid}")
+        stats.ttfb.append(time.perf_counter() - t0)
+        stats.requests += 1
+        if r.status_code != 200:
+            stats.errors += 1
+
+async def drive(args, files) -> Stats:
+    stats = Stats()
+    queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(None)
+
+    async def worker(http):
+        while not queue.empty():
+            queue.get_nowait()
+            await one_request(http, stats, files, args.workload)
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120, limits=limits) as http:
+        await asyncio.gather(*(worker(http) for _ in range(args.concurrency)))
+    return stats
+
+def pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+async def main():
+    args = parse_args()
+    random.seed(1)
+    files = install_fakes(args)
+    app = FastAPI()
+    app.include_router(streaming.router)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, lifespan="off", log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    t0 = time.perf_counter()
+    stats = await drive(args, files)
+    elapsed = time.perf_counter() - t0
+
+    server.should_exit = True
+    await serve_task
+
+    tg_requests = sum(c.session.requests for c in streaming.multi_clients.values())
+    tg_meta = sum(c.get_messages_calls for c in streaming.multi_clients.values())
+    lines = [
+        f"workload={args.workload} clients={args.clients} concurrency={args.concurrency} requests={args.requests} "
+        f"latency={args.latency}s bandwidth={args.bandwidth_mb or 'inf'}MB/s flood_rate={args.flood_rate}",
+        f"  elapsed        {elapsed:8.2f} s",
+        f"  throughput     {stats.bytes / MB / elapsed:8.2f} MB/s ({stats.bytes / MB:.1f} MB)",
+        f"  requests/sec   {stats.requests / elapsed:8.2f}",
+        f"  ttfb p50/p95/p99  {pct(stats.ttfb, .5) * 1000:.1f} / {pct(stats.ttfb, .95) * 1000:.1f} / {pct(stats.ttfb, .99) * 1000:.1f} ms"
+        + (f" (mean {statistics.mean(stats.ttfb) * 1000:.1f} ms)" if stats.ttfb else ""),
+        f"  errors/corrupt {stats.errors} / {stats.corrupt}",
+        f"  telegram       {tg_requests} GetFile, {tg_meta} get_messages",
+        f"  peak RSS       {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB",
+    ]
+    report = "\n".join(lines)
+    print(report)
+    if args.output:
+        with open(args.output, "a") as fh:
+            fh.write(report + "\n\n")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,254 @@
+# cache.py (METADATA AUR DISK CHUNK CACHES)
+
+import os
+import time
+import tempfile
+import asyncio
+import collections
+from config import Config
+import metrics
+
+STALE_TMP_SECONDS = 600  # itni purani .tmp file kisi chalu write ki nahi ho sakti
+
+class TTLCache:
+    """ Chhota in-process cache: har entry `ttl` seconds tak valid, `maxsize` se zyada hone par LRU eviction. """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        if item[0] < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return item[1]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+class ChunkCache:
+    """
+    Telegram se aaye file parts ko disk par rakhta hai taaki hot files baar-baar download na hon.
+    Key = (media_id, offset, limit). Size limit paar hone par LRU ya LFU ke hisaab se purane parts hatata hai.
+    Ek hi part ke liye aaye concurrent requests ek hi Telegram fetch share karte hain.
+    """
+    def __init__(self, directory: str, max_bytes: int, policy: str = "lru"):
+        self.root = directory  # X-Accel paths isi ke relative hote hain (nginx alias)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.policy = policy.lower()
+        self._index = collections.OrderedDict()  # key -> [size, hits]
+        self._per_media = collections.Counter()  # media_id -> kitne parts cached
+        self._size = 0
+        self._inflight = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def partition(self, name: str, parts: int):
+        """
+        WEB_WORKERS mode: har process ki apni sub-directory aur size limit ka apna hissa. Processes ek doosre ki
+        files evict nahi karte, aur sab milkar CHUNK_CACHE_MB se zyada disk nahi lete. load() se pehle call karein.
+        """
+        self.directory = os.path.join(self.root, name)
+        self.max_bytes //= max(1, parts)
+
+    def _path(self, key) -> str:
+        media_id, offset, limit = key
+        return os.path.join(self.directory, str(media_id), f"{offset}_{limit}")
+
+    async def load(self):
+        """
+        Startup par disk pe pade parts ka index banata hai (purane pehle, taaki LRU order sahi rahe).
+        Directory scan executor mein hota hai; index sirf event loop par badalta hai, kyunki serving is dauraan chalu rehti hai.
+        """
+        if not self.enabled:
+            return
+        found = await asyncio.get_running_loop().run_in_executor(None, self._scan)
+        # Scan ke dauraan store hue parts naye hain: unhe LRU order mein disk wale parts ke baad rakho
+        merged = collections.OrderedDict()
+        for key, size in found:
+            if key not in self._index:
+                merged[key] = [size, 0]
+                self._per_media[key[0]] += 1
+                self._size += size
+        merged.update(self._index)
+        self._index = merged
+        self._evict()
+        print(f"✅ Chunk cache ready: {len(self._index)} parts, {self._size // (1024 * 1024)} MB.")
+
+    def _scan(self) -> list:
+        """ Disk par pade parts [(key, size), ...], sabse purane (atime) pehle. Koi shared state nahi chhoota. """
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for media_dir in os.scandir(self.directory):
+            if not media_dir.is_dir():
+                continue
+            try:
+                media_id = int(media_dir.name)
+            except ValueError:
+                continue  # jaise mounted volume ka lost+found
+            for entry in os.scandir(media_dir.path):
+                try:
+                    if entry.name.endswith(".tmp"):
+                        # Crash/restart se pehle adhuri likhi file; nayi wali kisi doosre process ka chalu write ho sakti hai
+                        if time.time() - entry.stat().st_mtime > STALE_TMP_SECONDS:
+                            os.remove(entry.path)
+                        continue
+                    offset, limit = map(int, entry.name.split("_"))
+                    st = entry.stat()
+                except (ValueError, OSError):
+                    continue
+                found.append((st.st_atime, (media_id, offset, limit), st.st_size))
+        return [(key, size) for _, key, size in sorted(found)]
+
+    async def get_or_fetch(self, key, fetch) -> bytes:
+        """ Part cache mein ho toh disk se deta hai, warna `fetch()` se laa kar cache mein daalta hai. """
+        if not self.enabled:
+            return await fetch()
+        if key in self._index:
+            try:
+                data = await asyncio.get_running_loop().run_in_executor(None, self._read, key)
+                self._touch(key)
+                metrics.CACHE_REQUESTS.inc("chunk", "hit")
+                return data
+            except OSError:
+                self._drop(key)
+        task = self._inflight.get(key)
+        if task is None:
+            metrics.CACHE_REQUESTS.inc("chunk", "miss")
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            metrics.CACHE_REQUESTS.inc("chunk", "coalesced")
+        # shield: ek viewer ke disconnect hone se baaki waiting viewers ka fetch cancel nahi hona chahiye
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, key, fetch) -> bytes:
+        data = await fetch()
+        await self.store(key, data)
+        return data
+
+    async def store(self, key, data: bytes):
+        """ Bytes ko seedha cache mein likhta hai (jaise poore segments, X-Accel hand-off ke liye). """
+        if not self.enabled or not data or len(data) > self.max_bytes:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, key, data)
+        except OSError as e:
+            print(f"Chunk cache write error: {e}")
+            return
+        if key in self._index:
+            self._size -= self._index[key][0]
+        else:
+            self._per_media[key[0]] += 1
+        self._index[key] = [len(data), 1]
+        self._size += len(data)
+        self._evict()
+
+    def has(self, key) -> bool:
+        """ Part disk par hai ya abhi fetch ho raha hai. """
+        return self.enabled and (key in self._index or key in self._inflight)
+
+    def has_media(self, media_id: int) -> bool:
+        return media_id in self._per_media
+
+    def local_path(self, key):
+        """
+        Cached entry ka CHUNK_CACHE_DIR ke andar relative path (nginx ko dene ke liye), ya None.
+        File pehle stat hoti hai: bahar se hat gayi ya adhuri ho toh entry drop, aur caller normal streaming karta hai.
+        """
+        if not self.enabled or key not in self._index:
+            return None
+        path = self._path(key)
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            size = None
+        if size != self._index[key][0]:
+            self._drop(key)
+            return None
+        self._touch(key)
+        metrics.CACHE_REQUESTS.inc("chunk", "hit")
+        return os.path.relpath(path, self.root)
+
+    def media_ids(self, limit: int) -> list:
+        """ Haal hi mein use hui files ke media ids (cluster ko batane ke liye ki kya cached hai). """
+        ids = []
+        for media_id, _, _ in reversed(self._index):
+            if media_id not in ids:
+                ids.append(media_id)
+                if len(ids) >= limit:
+                    break
+        return ids
+
+    def _read(self, key) -> bytes:
+        with open(self._path(key), "rb") as fh:
+            data = fh.read()
+        if not data:
+            # Khaali file (jaise bahar se truncate hui): miss maano, get_or_fetch entry drop karke dobara laayega
+            raise OSError(f"empty cache file for {key}")
+        return data
+
+    def _write(self, key, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Har writer ki apni temp file: do requests (ya WEB_WORKERS processes) ek hi key likhein toh bhi
+        # os.replace hamesha poori likhi file hi publish karta hai
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.chmod(tmp, 0o644)  # mkstemp 0600 banata hai; X-Accel ke liye nginx ko padhna hai
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _touch(self, key):
+        entry = self._index.get(key)
+        if entry is not None:
+            entry[1] += 1
+            self._index.move_to_end(key)
+
+    def _drop(self, key):
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        self._size -= entry[0]
+        self._per_media[key[0]] -= 1
+        if self._per_media[key[0]] <= 0:
+            del self._per_media[key[0]]
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._index:
+            if self.policy == "lfu":
+                victim = min(self._index, key=lambda k: self._index[k][1])
+            else:
+                victim = next(iter(self._index))
+            self._drop(victim)
+
+chunk_cache = ChunkCache(Config.CHUNK_CACHE_DIR, Config.CHUNK_CACHE_MB * 1024 * 1024, Config.CHUNK_CACHE_POLICY)
@@ -0,0 +1,94 @@
+# cluster.py (MULTI-NODE / MULTI-WORKER SHARED STATE)
+
+import os
+import time
+import socket
+import asyncio
+import datetime
+from config import Config
+from database import db
+from cache import TTLCache
+
+def owns_client(client_id: int) -> bool:
+    """
+    Yeh worker kaunse clients chalayega. ROLE=stream mein clients workers mein baant diye jaate hain
+    (client_id % WORKER_COUNT == WORKER_INDEX), taaki koi bot do jagah start na ho.
+    """
+    if Config.ROLE == "bot":
+        return client_id == 0
+    if Config.ROLE == "stream":
+        return client_id % max(1, Config.WORKER_COUNT) == Config.WORKER_INDEX
+    return True
+
+class NodeRegistry:
+    """
+    Har node/worker apna haal (role, URL, clients, load, hot files) shared store mein heartbeat karta hai.
+    Store MongoDB ka `nodes` collection hai; DATABASE_URL na ho toh sirf local memory (single node).
+    Bot node isi se links ke liye sabse sahi streaming worker chunta hai.
+    """
+    def __init__(self):
+        self._local = {}
+        self._task = None
+        # Links banate waqt har request par Mongo query na ho; nodes ka haal waise bhi har heartbeat par hi badalta hai
+        self._streamers = TTLCache(1, Config.NODE_HEARTBEAT)
+
+    @property
+    def node_id(self) -> str:
+        # pid har baar padho: WEB_WORKERS mode mein forked processes ka id alag hona chahiye
+        return f"{Config.NODE_ID or socket.gethostname()}:{os.getpid()}"
+
+    async def publish(self, state: dict):
+        doc = dict(state, _id=self.node_id, role=Config.ROLE, url=Config.NODE_URL or Config.BASE_URL, updated_at=time.time())
+        self._local[self.node_id] = doc
+        if db.nodes is not None:
+            # seen_at par TTL index hai: band pade nodes apne aap hat jaate hain
+            await db.nodes.replace_one({'_id': self.node_id}, dict(doc, seen_at=datetime.datetime.utcnow()), upsert=True)
+
+    async def nodes(self) -> list:
+        """ Zinda nodes (jinka heartbeat haal hi mein aaya ho). """
+        cutoff = time.time() - 3 * Config.NODE_HEARTBEAT
+        if db.nodes is not None:
+            return await db.nodes.find({'updated_at': {'$gte': cutoff}}).to_list(length=None)
+        return [d for d in self._local.values() if d['updated_at'] >= cutoff]
+
+    async def stream_base_url(self, media_id: int = None) -> str:
+        """
+        Link ke liye streaming node ka base URL: jis node ke paas file pehle se hot/cached hai woh,
+        warna sabse kam load wala streaming node, warna BASE_URL.
+        """
+        candidates = self._streamers.get('nodes')
+        if candidates is None:
+            try:
+                candidates = [n for n in await self.nodes() if n.get('role') != 'bot' and n.get('clients') and n.get('url')]
+            except Exception as e:
+                print(f"Cluster: nodes nahi mile ({e}).")
+                return Config.BASE_URL
+            self._streamers.set('nodes', candidates)
+        if not candidates:
+            return Config.BASE_URL
+        if media_id is not None:
+            holders = [n for n in candidates if media_id in n.get('hot_files', [])]
+            if holders:
+                candidates = holders
+        best = min(candidates, key=lambda n: n.get('active_streams', 0) / max(1, len(n['clients'])))
+        return best['url'].rstrip('/')
+
+    async def _heartbeat(self, collect_state):
+        while True:
+            try:
+                await self.publish(collect_state())
+            except Exception as e:
+                print(f"Cluster heartbeat error: {e}")
+            await asyncio.sleep(Config.NODE_HEARTBEAT)
+
+    def start(self, collect_state):
+        """ `collect_state()` (dict lautata hai) ko har NODE_HEARTBEAT seconds publish karta hai. """
+        if self._task is None:
+            self._task = asyncio.create_task(self._heartbeat(collect_state))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+registry = NodeRegistry()
@@ -32,3 +32,138 @@ class Config:
         
     # Yeh bot ka username store karega (code isse automatic set karega)
     BOT_USERNAME = ""
+
+    # --- DEPLOYMENT ROLES / SCALE-OUT ---
+    # "all" = sab kuch ek process mein (default), "bot" = sirf updates handle karne wala bot + pages,
+    # "stream" = sirf streaming worker (updates poll nahi karta, MULTI_TOKEN clients ka apna hissa chalata hai)
+    ROLE = os.environ.get("ROLE", "all").lower()
+    # ROLE=stream: saare streaming workers mein is worker ka number aur kul workers.
+    # Client `i` us worker par chalta hai jahan i % WORKER_COUNT == WORKER_INDEX.
+    WORKER_INDEX = int(os.environ.get("WORKER_INDEX", 0))
+    WORKER_COUNT = int(os.environ.get("WORKER_COUNT", 1))
+    # Is machine par kitne uvicorn processes (sirf ROLE=stream); process p ko WORKER_INDEX + p milta hai
+    WEB_WORKERS = int(os.environ.get("WEB_WORKERS", 1))
+    # Is node ka naam aur public URL (links isi URL par bane); heartbeat interval seconds mein
+    NODE_ID = os.environ.get("NODE_ID", "")
+    NODE_URL = os.environ.get("NODE_URL", "").rstrip('/')
+    NODE_HEARTBEAT = int(os.environ.get("NODE_HEARTBEAT", 15))
+
+    # --- STREAMING TUNING ---
+    # Ek stream ke liye kitne GetFile requests ek saath flight mein rahenge (1 = purana serial mode)
+    PREFETCH_WINDOW = int(os.environ.get("PREFETCH_WINDOW", 4))
+    # Ek stream read-ahead mein zyada se zyada kitni memory (MB) rakh sakta hai
+    PREFETCH_MAX_MB = int(os.environ.get("PREFETCH_MAX_MB", 8))
+    # Ek file ke parts kitne clients mein baant kar ek saath laaye jaayein (0/1 = striping band)
+    STRIPE_CLIENTS = int(os.environ.get("STRIPE_CLIENTS", 0))
+    # Ek part ke liye kitni baar retry (timeouts/5xx/expired file reference)
+    PART_RETRIES = int(os.environ.get("PART_RETRIES", 4))
+    PART_RETRY_BACKOFF = float(os.environ.get("PART_RETRY_BACKOFF", 0.5))
+    # Koi doosra client free na ho toh stream itne seconds tak ka FloodWait jhel lega, isse zyada par band
+    PART_MAX_FLOOD_WAIT = int(os.environ.get("PART_MAX_FLOOD_WAIT", 30))
+    # Saare streams milkar itni memory (MB) tak ke parts flight/buffer mein rakh sakte hain (0 = koi limit nahi)
+    STREAM_MEMORY_MB = int(os.environ.get("STREAM_MEMORY_MB", 128))
+    # Client itne seconds tak data na padhe toh stream band karke slot free karo (0 = band)
+    STREAM_IDLE_TIMEOUT = int(os.environ.get("STREAM_IDLE_TIMEOUT", 60))
+    # GetFile chunk size har request ke hisaab se (chhote probes chhote chunks, sequential 1 MB); band = hamesha 1 MB
+    ADAPTIVE_CHUNKS = os.environ.get("ADAPTIVE_CHUNKS", "true").lower() in ("1", "true", "yes")
+    # Isse zyada GetFile latency (seconds) wala DC "slow" maana jaata hai aur seeks par bhi 1 MB chunks milte hain
+    SLOW_DC_LATENCY = float(os.environ.get("SLOW_DC_LATENCY", 0.3))
+
+    # --- OBSERVABILITY ---
+    # /metrics endpoint (Prometheus format)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # --- MEDIA SESSIONS ---
+    # Startup par har client ke saare DCs ke media sessions pehle se bana lo
+    SESSION_PREWARM = os.environ.get("SESSION_PREWARM", "true").lower() in ("1", "true", "yes")
+    # Kitne seconds mein media sessions ko ping karke check karna hai (0 = band)
+    SESSION_KEEPALIVE = int(os.environ.get("SESSION_KEEPALIVE", 60))
+
+    # --- DISK CHUNK CACHE ---
+    # Hot files ke parts disk par rakhne ke liye (0 = cache band)
+    CHUNK_CACHE_MB = int(os.environ.get("CHUNK_CACHE_MB", 0))
+    CHUNK_CACHE_DIR = os.environ.get("CHUNK_CACHE_DIR", "cache/chunks")
+    CHUNK_CACHE_POLICY = os.environ.get("CHUNK_CACHE_POLICY", "lru")  # "lru" ya "lfu"
+
+    # --- VIEWER FAN-OUT ---
+    # Ek hi file ke kai viewers hon toh haal ke parts memory mein share karo
+    FANOUT_MAX_MB = int(os.environ.get("FANOUT_MAX_MB", 32))
+    FANOUT_RING_PARTS = int(os.environ.get("FANOUT_RING_PARTS", 8))
+    # Kitne active viewers hone par file "hot" maani jaayegi
+    FANOUT_MIN_VIEWERS = int(os.environ.get("FANOUT_MIN_VIEWERS", 2))
+
+    # --- FILE METADATA CACHE ---
+    # message_id -> FileId/size/mime/name, taaki har Range request par get_messages na ho
+    FILE_CACHE_SIZE = int(os.environ.get("FILE_CACHE_SIZE", 2048))
+    FILE_CACHE_TTL = int(os.environ.get("FILE_CACHE_TTL", 6 * 3600))
+    # Metadata ko database (links collection) mein bhi save karo
+    FILE_META_PERSIST = os.environ.get("FILE_META_PERSIST", "true").lower() in ("1", "true", "yes")
+    # /show pages kitni der (seconds) server aur browser cache mein rahein
+    SHOW_CACHE_TTL = int(os.environ.get("SHOW_CACHE_TTL", 60))
+
+    # --- UPLOAD INGESTION QUEUE ---
+    # Forward kiye gaye files kitne workers storage channel mein copy karenge
+    INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", 4))
+    # Copies per second: sab users milakar, aur ek user ke liye
+    INGEST_RATE = float(os.environ.get("INGEST_RATE", 10))
+    INGEST_USER_RATE = float(os.environ.get("INGEST_USER_RATE", 3))
+    # Ek user ki queue mein zyada se zyada kitni files
+    INGEST_USER_MAX = int(os.environ.get("INGEST_USER_MAX", 500))
+    # Links kitne batch mein / kitni der mein database mein likhe jaayein
+    INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", 50))
+    INGEST_FLUSH_SECONDS = float(os.environ.get("INGEST_FLUSH_SECONDS", 1))
+    # Aakhri file ke baad reply se pehle kitna rukein (album ki baaki files ke liye)
+    INGEST_REPLY_DELAY = float(os.environ.get("INGEST_REPLY_DELAY", 2))
+
+    # --- DATABASE ---
+    # MongoDB connection pool
+    MONGO_MAX_POOL = int(os.environ.get("MONGO_MAX_POOL", 50))
+    MONGO_MIN_POOL = int(os.environ.get("MONGO_MIN_POOL", 5))
+    MONGO_TIMEOUT_MS = int(os.environ.get("MONGO_TIMEOUT_MS", 5000))
+    # Link lookups (unique_id -> link document) ka in-process cache
+    LINK_CACHE_SIZE = int(os.environ.get("LINK_CACHE_SIZE", 4096))
+    LINK_CACHE_TTL = int(os.environ.get("LINK_CACHE_TTL", 300))
+    # Itne din baad naye links expire ho jaayenge (0 = kabhi nahi)
+    LINK_EXPIRY_DAYS = float(os.environ.get("LINK_EXPIRY_DAYS", 0))
+
+    # --- /dl QUOTAS AUR RATE LIMITS ---
+    # Proxy (Cloudflare/nginx) ke peeche ho tabhi X-Forwarded-For par bharosa karo
+    TRUST_PROXY_HEADERS = os.environ.get("TRUST_PROXY_HEADERS", "false").lower() in ("1", "true", "yes")
+    # App ke aage kitne proxies X-Forwarded-For mein IP jodte hain (jaise Cloudflare -> nginx = 2)
+    TRUSTED_PROXY_HOPS = max(1, int(os.environ.get("TRUSTED_PROXY_HOPS", 1)))
+    # Har IP ke /dl requests per second (burst ke saath); 0 = koi limit nahi.
+    # Per-IP limits tabhi on karo jab asli client IP dikhta ho (seedha ya TRUST_PROXY_HEADERS se),
+    # warna load balancer ke peeche saare users ek hi IP lagenge.
+    IP_REQUEST_RATE = float(os.environ.get("IP_REQUEST_RATE", 0))
+    IP_REQUEST_BURST = float(os.environ.get("IP_REQUEST_BURST", 40))
+    # Ek saath chalne wale streams: har IP, har link, aur har Telegram client par (0 = koi limit nahi)
+    MAX_STREAMS_PER_IP = int(os.environ.get("MAX_STREAMS_PER_IP", 0))
+    MAX_STREAMS_PER_LINK = int(os.environ.get("MAX_STREAMS_PER_LINK", 0))
+    STREAMS_PER_CLIENT = int(os.environ.get("STREAMS_PER_CLIENT", 16))
+    # Saare slots bhare hon toh request kitni der queue mein ruke
+    STREAM_QUEUE_TIMEOUT = float(os.environ.get("STREAM_QUEUE_TIMEOUT", 15))
+    # Bandwidth caps (0 = koi limit nahi)
+    GLOBAL_RATE_MBPS = float(os.environ.get("GLOBAL_RATE_MBPS", 0))
+    IP_RATE_KBPS = float(os.environ.get("IP_RATE_KBPS", 0))
+    LINK_RATE_KBPS = float(os.environ.get("LINK_RATE_KBPS", 0))
+
+    # --- SIGNED STREAM URLS ---
+    # Stream tokens ka HMAC secret (khaali ho toh BOT_TOKEN se banta hai; saare nodes par same hona chahiye)
+    STREAM_SECRET = os.environ.get("STREAM_SECRET", "")
+    # Token kitni der (seconds) valid rahe
+    STREAM_TOKEN_TTL = int(os.environ.get("STREAM_TOKEN_TTL", 12 * 3600))
+    # true = purane /dl/{message_id} links band, sirf signed /stream links chalenge
+    SIGNED_STREAMS_ONLY = os.environ.get("SIGNED_STREAMS_ONLY", "false").lower() in ("1", "true", "yes")
+
+    # --- SEGMENTED DELIVERY ---
+    # /seg/... : file ke fixed-size byte segments immutable URLs par (CDN/browser cache ke liye)
+    SEGMENTS_ENABLED = os.environ.get("SEGMENTS_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Segment size MB mein (poore MB, taaki 1 MB GetFile parts par aligned rahe)
+    SEGMENT_SIZE = max(1, int(os.environ.get("SEGMENT_MB", 4))) * 1024 * 1024
+
+    # --- HTTP CACHING ---
+    # /dl content ka Cache-Control max-age (message ka content kabhi nahi badalta); signed links par token expiry tak hi
+    CONTENT_MAX_AGE = int(os.environ.get("CONTENT_MAX_AGE", 365 * 24 * 3600))
+    # Local nginx ke saath: disk par cached segments nginx khud bheje (X-Accel-Redirect). Internal location ka prefix,
+    # jaise "/_chunks/" (nginx mein `location /_chunks/ { internal; alias <CHUNK_CACHE_DIR>/; }`). Khaali = band.
+    X_ACCEL_PREFIX = os.environ.get("X_ACCEL_PREFIX", "")
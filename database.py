@@ -1,13 +1,23 @@
 # database.py (UPDATED VERSION)
 
+import datetime
 import motor.motor_asyncio
+from pymongo.errors import BulkWriteError
 from config import Config
+from cache import TTLCache
+import metrics
+
+# Link lookups ko sirf yahi fields chahiye (media_key jaise internal fields nahi)
+LINK_FIELDS = {'message_id': 1, 'file_id': 1, 'file_unique_id': 1, 'file_size': 1, 'mime_type': 1, 'file_name': 1, 'dc_id': 1, 'duration': 1, 'date': 1, 'expires_at': 1}
 
 class Database:
     def __init__(self):
         self._client = None
         self.db = None
         self.collection = None
+        self.nodes = None
+        self.connected = False  # connect() poora hone tak False (startup background mein hota hai)
+        self._links = TTLCache(Config.LINK_CACHE_SIZE, Config.LINK_CACHE_TTL)
         if not Config.DATABASE_URL:
             print("WARNING: DATABASE_URL not set. Links will not be permanent.")
 
@@ -15,13 +25,49 @@ class Database:
         """Database se connection banata hai."""
         if Config.DATABASE_URL:
             print("Connecting to the database...")
-            self._client = motor.motor_asyncio.AsyncIOMotorClient(Config.DATABASE_URL)
+            self._client = motor.motor_asyncio.AsyncIOMotorClient(
+                Config.DATABASE_URL,
+                maxPoolSize=Config.MONGO_MAX_POOL,
+                minPoolSize=Config.MONGO_MIN_POOL,
+                maxIdleTimeMS=5 * 60 * 1000,
+                serverSelectionTimeoutMS=Config.MONGO_TIMEOUT_MS,
+                connectTimeoutMS=Config.MONGO_TIMEOUT_MS,
+                retryWrites=True,
+            )
             self.db = self._client["StreamLinksDB"]
             self.collection = self.db["links"]
+            self.nodes = self.db["nodes"]
+            await self.ensure_indexes()
+            self.connected = True
             print("✅ Database connection established.")
         else:
             self.db = None
             self.collection = None
+            self.nodes = None
+
+    async def ensure_indexes(self):
+        """ Startup par zaroori indexes banata hai (pehle se hon toh kuch nahi hota) aur unki list print karta hai. """
+        with metrics.MONGO_SECONDS.time('create_index'):
+            await self.collection.create_index('message_id')
+            # Ek media (file_unique_id) ka ek hi storage message. Alag field isliye ki /backfill purane
+            # duplicate copies par file_unique_id likhe toh index na toote.
+            await self.collection.create_index('media_key', unique=True, sparse=True)
+            # LINK_EXPIRY_DAYS wale links expires_at ke baad MongoDB khud hata deta hai
+            await self.collection.create_index('expires_at', expireAfterSeconds=0)
+            await self.nodes.create_index('seen_at', expireAfterSeconds=10 * Config.NODE_HEARTBEAT)
+            indexes = await self.collection.index_information()
+        print(f"Database indexes: {', '.join(sorted(indexes))}")
+
+    @staticmethod
+    def _expired(doc) -> bool:
+        expires_at = doc.get('expires_at')
+        return expires_at is not None and expires_at <= datetime.datetime.utcnow()
+
+    @staticmethod
+    def _with_expiry(doc: dict) -> dict:
+        if Config.LINK_EXPIRY_DAYS > 0 and 'expires_at' not in doc:
+            doc['expires_at'] = datetime.datetime.utcnow() + datetime.timedelta(days=Config.LINK_EXPIRY_DAYS)
+        return doc
 
     async def disconnect(self):
         """Database connection ko band karta hai."""
@@ -29,14 +75,83 @@ class Database:
             self._client.close()
             print("Database connection closed.")
 
-    async def save_link(self, unique_id, message_id):
-        if self.collection is not None:
-            await self.collection.insert_one({'_id': unique_id, 'message_id': message_id})
+    async def save_links(self, docs):
+        """
+        Kai links ek saath (ek hi round-trip mein) save karta hai. `(duplicates, failed)` lautata hai:
+        `media_key` index ki wajah se reject hue docs (same file pehle se saved) ke index, aur baaki
+        reject hue docs ka {index: error message}. Baaki sab docs save ho chuke hote hain (ordered=False).
+        """
+        if self.collection is None or not docs:
+            return [], {}
+        try:
+            with metrics.MONGO_SECONDS.time('save_links'):
+                await self.collection.insert_many([self._with_expiry(doc) for doc in docs], ordered=False)
+        except BulkWriteError as e:
+            duplicates, failed = [], {}
+            for err in e.details.get('writeErrors', []):
+                if err.get('code') == 11000:
+                    duplicates.append(err['index'])
+                else:
+                    failed[err['index']] = err.get('errmsg', f"write error {err.get('code')}")
+            return duplicates, failed
+        return [], {}
 
-    async def get_link(self, unique_id):
-        if self.collection is not None:
-            doc = await self.collection.find_one({'_id': unique_id})
-            return doc.get('message_id') if doc else None
+    async def get_link_by_media(self, media_key):
+        """ Is file (file_unique_id) ka pehle se bana (aur expire na hua) link, agar ho. """
+        if self.collection is None or not media_key:
+            return None
+        with metrics.MONGO_SECONDS.time('get_link_by_media'):
+            doc = await self.collection.find_one({'media_key': media_key}, LINK_FIELDS)
+        if doc is not None and self._expired(doc):
+            # TTL monitor minute mein ek baar chalta hai; tab tak ruke bina hata do taaki naya link ban sake
+            with metrics.MONGO_SECONDS.time('delete_link'):
+                await self.collection.delete_one({'_id': doc['_id']})
+            self._links.invalidate(doc['_id'])
+            return None
+        return doc
+
+    async def get_link_doc(self, unique_id):
+        """ Poora link document (message_id + saved metadata) ek hi lookup mein; hot links process ke cache se. """
+        if self.collection is None:
+            return None
+        doc = self._links.get(unique_id)
+        metrics.CACHE_REQUESTS.inc("link", "miss" if doc is None else "hit")
+        if doc is None:
+            with metrics.MONGO_SECONDS.time('get_link_doc'):
+                doc = await self.collection.find_one({'_id': unique_id}, LINK_FIELDS)
+            if doc is None:
+                return None
+            self._links.set(unique_id, doc)
+        if self._expired(doc):
+            self._links.invalidate(unique_id)
+            return None
+        return doc
+
+    async def get_links_without_meta(self, exclude=(), limit=200):
+        """ Purane links jinke saath metadata save nahi hai (backfill ke liye). `exclude` wale message ids chhod deta hai. """
+        if self.collection is None:
+            return []
+        cursor = self.collection.find(
+            {'file_id': {'$exists': False}, 'message_id': {'$nin': list(exclude)}},
+            {'message_id': 1}
+        )
+        return await cursor.to_list(length=limit)
+
+    async def get_file_meta(self, message_id):
+        """ Storage message ki saved metadata (file_id, size, mime, name) deta hai, agar pehle save hui ho. """
+        if self.collection is not None and Config.FILE_META_PERSIST:
+            with metrics.MONGO_SECONDS.time('get_file_meta'):
+                doc = await self.collection.find_one(
+                    {'message_id': message_id, 'file_id': {'$exists': True}},
+                    {'_id': 0, 'file_id': 1, 'file_unique_id': 1, 'file_size': 1, 'mime_type': 1, 'file_name': 1, 'dc_id': 1, 'duration': 1, 'date': 1}
+                )
+            return doc
         return None
 
+    async def save_file_meta(self, message_id, meta):
+        """ Us message ke saare links par metadata likh deta hai. """
+        if self.collection is not None and Config.FILE_META_PERSIST:
+            with metrics.MONGO_SECONDS.time('save_file_meta'):
+                await self.collection.update_many({'message_id': message_id}, {'$set': meta})
+
 db = Database()
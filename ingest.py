@@ -0,0 +1,183 @@
+# ingest.py (UPLOAD INGESTION QUEUE)
+
+import time
+import asyncio
+import collections
+import traceback
+from pyrogram.errors import FloodWait
+from config import Config
+from database import db
+from ratelimit import TokenBucket
+
+class IngestQueue:
+    """
+    Forward kiye gaye files ko ek-ek karke (worker pool se) storage channel mein daalta hai.
+    - Har user ki apni queue; workers users ke beech round-robin chalte hain, taaki ek bada album baaki users ko na roke.
+    - Global aur per-user rate limit (copies/second), aur FloodWait aaye toh saare workers utni der ruk jaate hain.
+    - Link documents `insert_many` se batch mein save hote hain.
+    - User ki saari files ho jaane par ek hi batched reply.
+
+    `prepare(message)` `(link_doc, is_new)` lautata hai: nayi file ho toh copy karke naya document, warna pehle wala link.
+    `reply(user_id, done, failed)` user ko jawab bhejta hai. Do copies ek saath save hon aur ek `media_key` index par
+    haar jaaye, toh `discard(doc)` us faaltu copy ko hata sakta hai.
+    """
+    def __init__(self, prepare, reply, discard=None):
+        self.prepare = prepare
+        self.reply = reply
+        self.discard = discard
+        self._ready = asyncio.Queue()  # round-robin: jin users ki queue mein kaam hai
+        self._queues = {}  # user_id -> deque[message]
+        self._batches = {}  # user_id -> {"pending", "done", "failed"}
+        self._user_buckets = {}
+        self._global = TokenBucket(Config.INGEST_RATE, max(1, Config.INGEST_RATE))
+        self._paused_until = 0.0
+        self._to_save = []  # (doc, future)
+        self._workers = []
+        self._flusher = None
+
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(Config.INGEST_WORKERS)]
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        for t in self._workers + ([self._flusher] if self._flusher else []):
+            t.cancel()
+        self._workers, self._flusher = [], None
+        # Jo files copy ho chuki hain unke links kho na jaayein
+        await self._flush()
+
+    def submit(self, user_id: int, message) -> bool:
+        """ File ko queue mein daalta hai. User ki queue bhari ho toh False. """
+        q = self._queues.get(user_id)
+        if q is not None and len(q) >= Config.INGEST_USER_MAX:
+            return False
+        batch = self._batches.setdefault(user_id, {"pending": 0, "done": [], "failed": []})
+        batch["pending"] += 1
+        if q is None:
+            q = self._queues[user_id] = collections.deque()
+            self._ready.put_nowait(user_id)
+        q.append(message)
+        return True
+
+    def _bucket(self, user_id: int) -> TokenBucket:
+        bucket = self._user_buckets.get(user_id)
+        if bucket is None:
+            bucket = self._user_buckets[user_id] = TokenBucket(Config.INGEST_USER_RATE, max(1, Config.INGEST_USER_RATE))
+        return bucket
+
+    def _requeue_user(self, user_id: int, delay: float = 0):
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._ready.put_nowait, user_id)
+        else:
+            self._ready.put_nowait(user_id)
+
+    async def _worker(self):
+        while True:
+            user_id = await self._ready.get()
+            q = self._queues.get(user_id)
+            if not q:
+                self._queues.pop(user_id, None)
+                continue
+            wait = self._bucket(user_id).delay()
+            if wait > 0:
+                # Is user ki baari baad mein; tab tak worker doosre users ka kaam kare
+                self._requeue_user(user_id, wait)
+                continue
+            self._bucket(user_id).try_take()
+            message = q.popleft()
+            if q:
+                self._requeue_user(user_id)
+            else:
+                self._queues.pop(user_id, None)
+            await self._process(user_id, message)
+
+    async def _process(self, user_id: int, message):
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            await self._global.take()
+            try:
+                doc, is_new = await self.prepare(message)
+                if is_new:
+                    existing = await self._save(doc)
+                    if existing is not None:
+                        await self._discard(doc)
+                        doc = existing
+                self._finish(user_id, message, doc)
+                return
+            except FloodWait as e:
+                print(f"Ingest: FloodWait {e.value}s, saare workers ruk rahe hain.")
+                self._paused_until = max(self._paused_until, time.monotonic() + e.value)
+            except Exception:
+                print(f"!!! INGEST ERROR: {traceback.format_exc()}")
+                self._finish(user_id, message, None)
+                return
+
+    async def _save(self, doc: dict):
+        """ Agle batch ke saath save karta hai. Yahi file pehle se saved nikli toh woh purana link lautata hai. """
+        fut = asyncio.get_running_loop().create_future()
+        self._to_save.append((doc, fut))
+        if len(self._to_save) >= Config.INGEST_BATCH_SIZE:
+            await self._flush()
+        return await fut
+
+    async def _flush(self):
+        items, self._to_save = self._to_save, []
+        if not items:
+            return
+        try:
+            duplicates, failed = await db.save_links([doc for doc, _ in items])
+        except Exception as e:
+            # Poora batch hi nahi gaya (jaise connection error)
+            for _, fut in items:
+                if not fut.done(): fut.set_exception(e)
+            return
+        # Sirf writeErrors mein aaye docs fail hote hain; baaki batch save ho chuka hai
+        duplicates = set(duplicates)
+        for i, (doc, fut) in enumerate(items):
+            if fut.done():
+                continue
+            try:
+                if i in failed:
+                    raise RuntimeError(f"link save failed: {failed[i]}")
+                existing = await db.get_link_by_media(doc.get('media_key')) if i in duplicates else None
+                fut.set_result(existing)
+            except Exception as e:
+                if not fut.done(): fut.set_exception(e)
+
+    async def _discard(self, doc: dict):
+        if self.discard is None:
+            return
+        try:
+            await self.discard(doc)
+        except Exception as e:
+            print(f"Ingest: duplicate copy hata nahi paaye ({doc.get('message_id')}). Error: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(Config.INGEST_FLUSH_SECONDS)
+            await self._flush()
+
+    def _finish(self, user_id: int, message, doc):
+        batch = self._batches[user_id]
+        if doc is None:
+            batch["failed"].append(message)
+        else:
+            batch["done"].append((message, doc))
+        batch["pending"] -= 1
+        if batch["pending"] == 0:
+            asyncio.create_task(self._reply_later(user_id, batch))
+
+    async def _reply_later(self, user_id: int, batch: dict):
+        # Thoda ruko: album ki aur files aa rahi hon toh sabka ek hi reply jaaye
+        await asyncio.sleep(Config.INGEST_REPLY_DELAY)
+        if batch["pending"] or self._batches.get(user_id) is not batch:
+            return
+        del self._batches[user_id]
+        try:
+            await self.reply(user_id, batch["done"], batch["failed"])
+        except Exception:
+            print(f"!!! INGEST REPLY ERROR: {traceback.format_exc()}")
@@ -0,0 +1,105 @@
+# metrics.py (PROMETHEUS-STYLE METRICS)
+
+import time
+import bisect
+from contextlib import contextmanager
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels=()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _label_str(self, values, extra=None) -> str:
+        pairs = list(zip(self.labels, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for values, v in sorted(self._values.items()):
+            lines.append(f"{self.name}{self._label_str(values)} {v}")
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name: str, doc: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        data = self._values.get(labels)
+        if data is None:
+            data = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        data[0][bisect.bisect_left(self.buckets, value)] += 1
+        data[1] += value
+        data[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for values, (counts, total, n) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + ("+Inf",), counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{self._label_str(values, ('le', bound))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(values)} {total}")
+            lines.append(f"{self.name}_count{self._label_str(values)} {n}")
+        return lines
+
+REGISTRY = []
+
+def render() -> str:
+    """ Saare metrics Prometheus text format mein. """
+    return "\n".join(line for m in REGISTRY for line in m.render()) + "\n"
+
+# --- Streaming hot path ---
+BYTES_STREAMED = Counter("streamix_bytes_streamed_total", "Bytes sent to HTTP clients, by serving client.", ["client"])
+X_ACCEL_BYTES = Counter("streamix_x_accel_bytes_total", "Cached segment bytes handed to the reverse proxy via X-Accel-Redirect.")
+TELEGRAM_BYTES = Counter("streamix_telegram_bytes_total", "Bytes fetched from Telegram via GetFile, by client.", ["client"])
+GETFILE_SECONDS = Histogram("streamix_getfile_seconds", "GetFile request latency, by DC.", ["dc"])
+GETFILE_ERRORS = Counter("streamix_getfile_errors_total", "Failed GetFile requests, by client and error.", ["client", "error"])
+FLOOD_WAITS = Counter("streamix_flood_waits_total", "FloodWait errors received, by client.", ["client"])
+TTFB_SECONDS = Histogram("streamix_dl_ttfb_seconds", "Time from /dl request to first body byte.")
+ACTIVE_STREAMS = Gauge("streamix_active_streams", "Streams currently being served.")
+STREAM_BUFFER_BYTES = Gauge("streamix_stream_buffer_bytes", "Bytes of parts in flight or buffered across all streams.")
+QUOTA_REJECTIONS = Counter("streamix_quota_rejections_total", "/dl requests refused by rate limits or quotas, by HTTP status.", ["status"])
+IDLE_EVICTIONS = Counter("streamix_idle_evictions_total", "Streams dropped because the client stopped reading.")
+
+# --- Caches aur database ---
+CACHE_REQUESTS = Counter("streamix_cache_requests_total", "Cache lookups, by cache and result.", ["cache", "result"])
+MONGO_SECONDS = Histogram("streamix_mongo_seconds", "MongoDB operation latency, by operation.", ["op"])
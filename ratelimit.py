@@ -0,0 +1,204 @@
+# ratelimit.py (TOKEN BUCKETS)
+
+import time
+import asyncio
+import collections
+from config import Config
+
+class TokenBucket:
+    """
+    Simple token bucket: `rate` tokens/second, zyada se zyada `capacity` jama.
+    `take()` udhaar (debt) bhi le sakta hai, isliye capacity se badi requests (jaise bade chunks ke bytes) bhi
+    rate ke hisaab se hi aage badhti hain. `rate <= 0` ka matlab koi limit nahi.
+    """
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, n: float = 1) -> float:
+        """ Kitne seconds baad `n` tokens milenge (bina liye). """
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        return max(0.0, (n - self.tokens) / self.rate)
+
+    def try_take(self, n: float = 1) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self.tokens >= n:
+            self.tokens -= n
+            return True
+        return False
+
+    async def take(self, n: float = 1):
+        if self.rate <= 0:
+            return
+        self._refill()
+        self.tokens -= n
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+class QuotaExceeded(Exception):
+    """ Stream quota bhar gaya. `status` 429 (is IP/link ki limit) ya 503 (server busy), `retry_after` seconds mein. """
+    def __init__(self, status: int, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+class StreamLease:
+    """ Ek admitted stream: bytes bhejne se pehle `throttle(n)`, khatam hone par `release()` (do baar bhi chal sakta hai). """
+    def __init__(self, limiter, ip: str, link, buckets: list):
+        self.limiter = limiter
+        self.ip = ip
+        self.link = link
+        self.buckets = buckets
+        self.released = False
+
+    async def throttle(self, n: int):
+        for bucket in self.buckets:
+            await bucket.take(n)
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.limiter._release(self)
+
+class StreamLimiter:
+    """
+    /dl ke liye quotas:
+    - Har IP ke requests/second (sequential message ids crawl karne wale scrapers ke liye).
+    - Concurrent streams: har IP aur har link ki limit (zyada par 429), aur global limit. Global bhar jaaye toh
+      requests queue mein rukti hain; queue IPs ke beech round-robin chalti hai, taaki 16 connections wala
+      download manager baaki viewers se aage na nikal jaaye.
+    - Bandwidth: global, har IP aur har link ke token buckets (bytes/second), streaming generator ke andar.
+    """
+    def __init__(self):
+        self._requests = {}  # ip -> TokenBucket (requests)
+        self._ip_streams = {}
+        self._link_streams = {}
+        self._active = 0
+        self._granted = 0  # jagaaye gaye waiters jo abhi admit hone wale hain
+        self._waiting = collections.OrderedDict()  # ip -> deque[future], round-robin order
+        self._global_bw = TokenBucket(Config.GLOBAL_RATE_MBPS * 1024 * 1024)
+        self._ip_bw = {}
+        self._link_bw = {}
+
+    def check_request(self, ip: str):
+        """ Request rate limit; paar ho toh QuotaExceeded(429). """
+        if Config.IP_REQUEST_RATE <= 0:
+            return
+        bucket = self._requests.get(ip)
+        if bucket is None:
+            if len(self._requests) > 10000:
+                # Purane (bhare hue) buckets hata do taaki memory na badhe
+                for key in [k for k, b in self._requests.items() if b.delay(b.capacity) == 0]:
+                    del self._requests[key]
+            bucket = self._requests[ip] = TokenBucket(Config.IP_REQUEST_RATE, Config.IP_REQUEST_BURST)
+        if not bucket.try_take():
+            raise QuotaExceeded(429, bucket.delay(), "Too many requests.")
+
+    async def admit(self, ip: str, link, capacity: int) -> StreamLease:
+        """ Stream shuru karne ki ijaazat. `capacity` = abhi kitne streams ek saath chal sakte hain (0 = koi limit nahi). """
+        if Config.MAX_STREAMS_PER_IP > 0 and self._ip_streams.get(ip, 0) >= Config.MAX_STREAMS_PER_IP:
+            raise QuotaExceeded(429, 5, "Too many parallel downloads from this address.")
+        if Config.MAX_STREAMS_PER_LINK > 0 and self._link_streams.get(link, 0) >= Config.MAX_STREAMS_PER_LINK:
+            raise QuotaExceeded(429, 5, "Too many parallel downloads of this file.")
+        # IP/link ki ginti mein queue mein ruke requests bhi shamil hain
+        self._ip_streams[ip] = self._ip_streams.get(ip, 0) + 1
+        self._link_streams[link] = self._link_streams.get(link, 0) + 1
+        try:
+            while capacity > 0 and self._waiting and self._active + self._granted < capacity:
+                self._wake_next()
+            if capacity > 0 and (self._active + self._granted >= capacity or self._waiting):
+                await self._wait_turn(ip)
+        except BaseException:
+            self._uncount(ip, link)
+            raise
+        self._active += 1
+        return StreamLease(self, ip, link, self._buckets(ip, link))
+
+    async def _wait_turn(self, ip: str):
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(ip, collections.deque()).append(fut)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), Config.STREAM_QUEUE_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if not fut.done():
+                fut.cancel()
+                self._drop_waiter(ip, fut)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise QuotaExceeded(503, 5, "All streaming slots are busy, please retry.")
+                raise
+            if isinstance(e, asyncio.CancelledError):
+                # Slot mil chuka tha par hum chale gaye: agle waiter ko de do
+                self._granted -= 1
+                self._wake_next()
+                raise
+        self._granted -= 1
+
+    def _drop_waiter(self, ip: str, fut):
+        q = self._waiting.get(ip)
+        if q is not None:
+            try:
+                q.remove(fut)
+            except ValueError:
+                pass
+            if not q:
+                del self._waiting[ip]
+
+    def _wake_next(self):
+        """ Agle IP (round-robin) ke sabse purane waiter ko slot do. """
+        while self._waiting:
+            ip, q = next(iter(self._waiting.items()))
+            fut = q.popleft()
+            if q:
+                self._waiting.move_to_end(ip)
+            else:
+                del self._waiting[ip]
+            if not fut.done():
+                self._granted += 1
+                fut.set_result(True)
+                return
+
+    def _buckets(self, ip: str, link) -> list:
+        for bw, counts in ((self._ip_bw, self._ip_streams), (self._link_bw, self._link_streams)):
+            if len(bw) > 10000:
+                for key in [k for k in bw if k not in counts]:
+                    del bw[key]
+        buckets = []
+        if Config.GLOBAL_RATE_MBPS > 0:
+            buckets.append(self._global_bw)
+        if Config.IP_RATE_KBPS > 0:
+            buckets.append(self._ip_bw.setdefault(ip, TokenBucket(Config.IP_RATE_KBPS * 1024)))
+        if Config.LINK_RATE_KBPS > 0:
+            buckets.append(self._link_bw.setdefault(link, TokenBucket(Config.LINK_RATE_KBPS * 1024)))
+        return buckets
+
+    def _uncount(self, ip: str, link):
+        for counts, bw, key in ((self._ip_streams, self._ip_bw, ip), (self._link_streams, self._link_bw, link)):
+            counts[key] -= 1
+            if counts[key] <= 0:
+                del counts[key]
+                # Bucket tabhi hatao jab us par koi udhaar (debt) na ho, warna reconnect karke limit se bach jaate
+                bucket = bw.get(key)
+                if bucket is not None and bucket.delay() == 0:
+                    del bw[key]
+
+    def _release(self, lease: StreamLease):
+        self._active -= 1
+        self._uncount(lease.ip, lease.link)
+        self._wake_next()
+
+    def snapshot(self) -> dict:
+        return {"active": self._active, "queued": sum(len(q) for q in self._waiting.values()), "ips": len(self._ip_streams)}
+
+stream_limiter = StreamLimiter()
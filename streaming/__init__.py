@@ -0,0 +1,13 @@
+# streaming/__init__.py (STREAMING CORE)
+#
+# Telegram se file streaming ka poora engine ek jagah: media sessions, client scheduler, part fetching,
+# range math, caching headers aur HTTP routes. app.py (bot + web) aur webserver.py (sirf web) dono
+# `router` mount karte hain, isliye har fix ek hi jagah hota hai.
+
+from .scheduler import scheduler
+from .sessions import session_pool
+from .engine import (
+    multi_clients, file_cache, add_client, start_client, initialize_clients,
+    get_media_meta, get_file_properties, open_stream,
+)
+from .web import router, get_readable_file_size, mask_filename
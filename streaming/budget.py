@@ -0,0 +1,59 @@
+# streaming/budget.py (GLOBAL STREAMING MEMORY BUDGET)
+
+import asyncio
+import collections
+from config import Config
+import metrics
+
+class MemoryBudget:
+    """
+    Saare streams milkar kitne bytes ke parts flight/buffer mein rakh sakte hain, uski global limit.
+    Limit bhar jaaye toh naye parts tab tak rukte hain jab tak doosre streams bytes release na karein (FIFO).
+    Agar kuch bhi use mein nahi hai toh ek request hamesha mil jaati hai, chahe limit se badi ho.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self._waiters = collections.deque()  # (n, future)
+
+    def _fits(self, n: int) -> bool:
+        return self.max_bytes <= 0 or self.used == 0 or self.used + n <= self.max_bytes
+
+    def _take(self, n: int):
+        self.used += n
+        metrics.STREAM_BUFFER_BYTES.set(self.used)
+
+    def try_acquire(self, n: int) -> bool:
+        """ Bina ruke budget lene ki koshish (read-ahead ke liye). """
+        if not self._waiters and self._fits(n):
+            self._take(n)
+            return True
+        return False
+
+    async def acquire(self, n: int):
+        if self.try_acquire(n):
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append((n, fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release(n)
+            raise
+
+    def release(self, n: int):
+        self.used -= n
+        metrics.STREAM_BUFFER_BYTES.set(self.used)
+        while self._waiters:
+            n_next, fut = self._waiters[0]
+            if fut.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(n_next):
+                break
+            self._waiters.popleft()
+            self._take(n_next)
+            fut.set_result(None)
+
+stream_budget = MemoryBudget(Config.STREAM_MEMORY_MB * 1024 * 1024)
@@ -0,0 +1,47 @@
+# streaming/chunking.py (ADAPTIVE GETFILE CHUNK SIZE)
+
+from config import Config
+from cache import TTLCache
+
+# Telegram ki shart: limit 4 KB ka multiple ho aur 1 MB ko poora divide kare, offset limit ka multiple ho
+MIN_CHUNK = 4 * 1024
+MAX_CHUNK = 1024 * 1024
+ALPHA = 0.2
+
+dc_latency = {}  # dc_id -> GetFile latency (seconds, EWMA)
+_last_end = TTLCache(4096, 120)  # (viewer, mid) -> pichhli request ka aakhri byte
+
+def observe_latency(dc_id: int, seconds: float):
+    prev = dc_latency.get(dc_id)
+    dc_latency[dc_id] = seconds if prev is None else prev + ALPHA * (seconds - prev)
+
+def is_sequential(viewer: str, mid: int, start: int, end: int) -> bool:
+    """ Request pichhli request ke theek baad se shuru ho (ya file ki shuruaat se), toh sequential maana jaata hai. """
+    key = (viewer, mid)
+    last = _last_end.get(key)
+    _last_end.set(key, end)
+    return start == 0 or (last is not None and start == last + 1)
+
+def choose_chunk_size(length: int, sequential: bool, dc_id: int = None) -> int:
+    """
+    Ek request ke pehle GetFile part ka size (aage ke parts aligned offsets par 1 MB tak badhte hain, ranges.plan_growing_parts):
+    - chhote probes (header/moov atom) ke liye range ke barabar ka sabse chhota allowed size,
+    - sequential downloads ke liye poora 1 MB,
+    - seeks ke liye tez DC par 256 KB (jaldi pehla byte), dheeme DC par bade chunks (kam round trips).
+    File ke parts pehle se cached hon toh shared_part 1 MB parts mein se hi kaat leta hai (cache keys same rehti hain).
+    """
+    if not Config.ADAPTIVE_CHUNKS:
+        return MAX_CHUNK
+    if length <= MAX_CHUNK // 2:
+        cs = MIN_CHUNK
+        while cs < length:
+            cs *= 2
+        return cs
+    if sequential:
+        return MAX_CHUNK
+    latency = dc_latency.get(dc_id)
+    if latency is None or latency >= Config.SLOW_DC_LATENCY:
+        return MAX_CHUNK
+    if latency >= Config.SLOW_DC_LATENCY / 2:
+        return MAX_CHUNK // 2
+    return MAX_CHUNK // 4
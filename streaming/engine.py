@@ -0,0 +1,364 @@
+# streaming/engine.py (TELEGRAM STREAMING ENGINE)
+
+import os
+import time
+import random
+import asyncio
+import collections
+from pyrogram import Client, raw
+from pyrogram.types import Message
+from pyrogram.errors import FloodWait, FileReferenceExpired, InternalServerError, ServiceUnavailable
+from pyrogram.file_id import FileId
+from pyrogram.session import Session
+
+from config import Config
+from database import db
+from cache import chunk_cache, TTLCache
+import metrics
+from .fanout import broadcaster
+from .budget import stream_budget
+from .sessions import session_pool
+from .scheduler import scheduler
+from . import ranges
+from . import chunking
+
+# Jo clients start ho chuke hain (client_id -> Client); 0 main bot hai
+multi_clients = {}; class_cache = {}; refresh_tasks = {}
+file_cache = TTLCache(Config.FILE_CACHE_SIZE, Config.FILE_CACHE_TTL)
+
+# =====================================================================================
+# --- MULTI-CLIENT LOGIC ---
+# =====================================================================================
+
+async def add_client(client_id: int, client: Client):
+    """ Start ho chuke client ko scheduler aur streaming pool mein daalta hai. """
+    scheduler.register(client_id, await client.storage.dc_id())
+    multi_clients[client_id] = client
+
+class TokenParser:
+    """ Environment variables se MULTI_TOKENs ko parse karta hai. """
+    @staticmethod
+    def parse_from_env():
+        return {
+            c + 1: t
+            for c, (_, t) in enumerate(
+                filter(lambda n: n[0].startswith("MULTI_TOKEN"), sorted(os.environ.items()))
+            )
+        }
+
+async def start_client(client_id, bot_token):
+    """ Ek naye client bot ko start karta hai. """
+    try:
+        print(f"Attempting to start Client: {client_id}")
+        client = await Client(
+            name=str(client_id), 
+            api_id=Config.API_ID, 
+            api_hash=Config.API_HASH,
+            bot_token=bot_token, 
+            no_updates=True, 
+            in_memory=True
+        ).start()
+        await add_client(client_id, client)
+        print(f"✅ Client {client_id} started successfully.")
+    except Exception as e:
+        scheduler.mark_failed(client_id, e)
+        print(f"!!! CRITICAL ERROR: Failed to start Client {client_id} - Error: {e}")
+
+async def initialize_clients(include=lambda client_id: True):
+    """ Saare additional clients ko initialize karta hai (sirf woh jinke liye `include(client_id)` True ho). """
+    all_tokens = {i: t for i, t in TokenParser.parse_from_env().items() if include(i)}
+    if not all_tokens:
+        print("No additional clients found. Using default bot only.")
+        return
+    
+    print(f"Found {len(all_tokens)} extra clients. Starting them...")
+    tasks = [start_client(i, token) for i, token in all_tokens.items()]
+    await asyncio.gather(*tasks)
+
+    if len(multi_clients) > 1:
+        print(f"✅ Multi-Client Mode Enabled. Total Clients: {len(multi_clients)}")
+
+# =====================================================================================
+# --- FILE PROPERTIES ---
+# =====================================================================================
+
+def get_media_meta(msg: Message) -> dict:
+    """ Message ke document/video/audio se woh details nikaalta hai jo streaming ke liye chahiye. """
+    m = None if not msg or msg.empty else (msg.document or msg.video or msg.audio)
+    if not m:
+        return None
+    return {
+        "file_id": m.file_id,
+        "file_unique_id": m.file_unique_id,
+        "file_size": m.file_size,
+        "mime_type": m.mime_type,
+        "file_name": m.file_name,
+        "dc_id": FileId.decode(m.file_id).dc_id,
+        "duration": getattr(m, "duration", None),
+        "date": int(msg.date.timestamp()) if msg.date else None,
+    }
+
+async def get_file_properties(c: Client, mid: int, refresh: bool = False) -> dict:
+    """
+    Storage message ki file details deta hai: pehle memory cache, phir database, aakhri mein Telegram.
+    `refresh=True` (jaise FILE_REFERENCE_EXPIRED par) seedha Telegram se nayi details laata hai.
+    """
+    props = None if refresh else file_cache.get(mid)
+    if props is not None:
+        metrics.CACHE_REQUESTS.inc("file_meta", "hit")
+        return props
+    meta = None if refresh else await db.get_file_meta(mid)
+    metrics.CACHE_REQUESTS.inc("file_meta", "miss" if meta is None else "db")
+    if meta is None:
+        msg = await c.get_messages(Config.STORAGE_CHANNEL, mid)
+        meta = get_media_meta(msg)
+        if not meta:
+            raise FileNotFoundError
+        try:
+            await db.save_file_meta(mid, meta)
+        except Exception as e:
+            print(f"Warning: File metadata save nahi hui ({mid}). Error: {e}")
+    props = dict(meta, fid=FileId.decode(meta["file_id"]))
+    file_cache.set(mid, props)
+    return props
+
+async def refresh_file_properties(c: Client, mid: int) -> dict:
+    """ Expired file reference ke liye Telegram se nayi details; ek message ke concurrent refresh ek hi call share karte hain. """
+    task = refresh_tasks.get(mid)
+    if task is None:
+        file_cache.invalidate(mid)
+        print(f"File reference expired for {mid}, refreshing...")
+        task = refresh_tasks[mid] = asyncio.ensure_future(get_file_properties(c, mid, refresh=True))
+        task.add_done_callback(lambda _: refresh_tasks.pop(mid, None))
+    return await asyncio.shield(task)
+
+# =====================================================================================
+# --- PART FETCHING ---
+# =====================================================================================
+
+class ByteStreamer:
+    """ Telegram se file ke parts (GetFile) nikaal kar stream karta hai. """
+    def __init__(self, c: Client):
+        self.client = c
+
+    @staticmethod
+    async def get_location(f: FileId):
+        return raw.types.InputDocumentFileLocation(id=f.media_id, access_hash=f.access_hash, file_reference=f.file_reference, thumb_size=f.thumbnail_size)
+
+    async def generate_media_session(self, f: FileId) -> Session:
+        """ File ke DC ke liye media session (session pool se) deta hai. """
+        return await session_pool.get(self.client, f.dc_id)
+
+    @staticmethod
+    async def get_part(ms: Session, loc, offset: int, limit: int) -> bytes:
+        """ Ek GetFile request. Khaali bytes ka matlab file khatam. """
+        r = await ms.invoke(raw.functions.upload.GetFile(location=loc, offset=offset, limit=limit), retries=0)
+        if isinstance(r, raw.types.upload.File):
+            return r.bytes
+        return b""
+
+    async def yield_file(self, f: FileId, i: int, parts: list, fc: int, lc: int, mid: int = None, claim=None):
+        fetcher = PartFetcher(i, f, mid, claim)
+        broadcaster.joined(f.media_id)
+        try:
+            fetch = lambda k, off, limit: shared_part(f.media_id, off, limit, fetcher)
+            async for cp, chk in iter_parts(fetch, parts, prefetch_bytes()):
+                chk = cut_part(chk, cp, len(parts), fc, lc)
+                metrics.BYTES_STREAMED.inc(fetcher.i, amount=len(chk))
+                yield chk
+        finally:
+            broadcaster.left(f.media_id)
+            fetcher.close()
+
+class PartFetcher:
+    """
+    Ek stream ki ek "lane" ke parts laata hai (client `i` se shuru karke).
+    - Timeout/network/5xx errors par exponential backoff ke saath retry.
+    - FloodWait par baaki parts ke liye doosre free client par shift ho jaata hai; koi free na ho toh wait karta hai.
+    - FILE_REFERENCE_EXPIRED par message dobara fetch karke naye file reference se retry.
+    """
+    TRANSIENT = (InternalServerError, ServiceUnavailable, OSError, asyncio.TimeoutError)
+
+    def __init__(self, i: int, f: FileId, mid: int = None, claim=None):
+        self.i = i
+        self.f = f
+        self.mid = mid
+        self.closed = False
+        scheduler.stream_started(i)
+        if claim is not None:
+            claim.consume(i)
+
+    def close(self):
+        # Viewer chala gaya; shielded fetches iske baad bhi chal sakte hain, woh ab slot/retry nahi lenge
+        if not self.closed:
+            self.closed = True
+            scheduler.stream_finished(self.i)
+
+    def _switch(self, new_i: int):
+        scheduler.stream_finished(self.i)
+        scheduler.stream_started(new_i)
+        self.i = new_i
+
+    async def __call__(self, off: int, limit: int) -> bytes:
+        attempt = 0
+        while True:
+            i, f = self.i, self.f
+            try:
+                ms = await get_streamer(multi_clients[i]).generate_media_session(f)
+                loc = await ByteStreamer.get_location(f)
+                t = time.perf_counter()
+                with metrics.GETFILE_SECONDS.time(f.dc_id):
+                    data = await scheduler.track(i, lambda: ByteStreamer.get_part(ms, loc, off, limit))
+                chunking.observe_latency(f.dc_id, time.perf_counter() - t)
+                return data
+            except FloodWait as e:
+                if self.closed:
+                    raise
+                alt = scheduler.pick(f.dc_id, exclude={i})
+                if alt is not None and alt in multi_clients and not scheduler.clients[alt].cooling:
+                    print(f"FloodWait {e.value}s on Client {i}, shifting stream to Client {alt}.")
+                    if self.i == i:
+                        self._switch(alt)
+                    continue
+                if e.value > Config.PART_MAX_FLOOD_WAIT:
+                    raise
+                await asyncio.sleep(e.value)
+            except FileReferenceExpired:
+                if self.closed or self.mid is None or attempt >= Config.PART_RETRIES:
+                    raise
+                attempt += 1
+                if self.f is f:
+                    self.f = (await refresh_file_properties(multi_clients[i], self.mid))["fid"]
+            except self.TRANSIENT as e:
+                if self.closed or attempt >= Config.PART_RETRIES:
+                    raise
+                delay = min(Config.PART_RETRY_BACKOFF * 2 ** attempt, 10) * random.uniform(0.5, 1)
+                attempt += 1
+                print(f"GetFile error on Client {i} at offset {off} ({e!r}), retry {attempt} in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+
+async def yield_file_striped(ids: list, f: FileId, parts: list, fc: int, lc: int, mid: int = None, claim=None):
+    """
+    Ek hi range ke parts ko kai clients (`ids`) mein round-robin baant kar ek saath laata hai.
+    Har client apna media session use karta hai; retry/FloodWait failover har lane ka PartFetcher sambhalta hai.
+    """
+    lanes = [PartFetcher(i, f, mid, claim) for i in ids]
+    broadcaster.joined(f.media_id)
+    try:
+        fetch = lambda k, off, limit: shared_part(f.media_id, off, limit, lanes[k % len(lanes)])
+        async for cp, chk in iter_parts(fetch, parts, prefetch_bytes(lanes=len(lanes))):
+            chk = cut_part(chk, cp, len(parts), fc, lc)
+            metrics.BYTES_STREAMED.inc(lanes[(cp - 1) % len(lanes)].i, amount=len(chk))
+            yield chk
+    finally:
+        broadcaster.left(f.media_id)
+        for lane in lanes: lane.close()
+
+async def shared_part(media_id: int, off: int, cs: int, fetch) -> bytes:
+    """
+    Part lookup ka poora raasta: viewers ke beech fan-out -> disk chunk cache -> Telegram (`fetch(off, limit)`).
+    Dono caches 1 MB parts rakhte hain; chhota (adaptive) part unhi mein se kaata jaata hai jab dhakne wala 1 MB part
+    cached/raaste mein ho ya file ka kuch bhi cached ho. Chhota GetFile sirf thandi files par hota hai.
+    """
+    full = chunking.MAX_CHUNK
+    base = off - off % full
+    if cs < full and (broadcaster.has((media_id, base, full)) or chunk_cache.has((media_id, base, full))
+                      or chunk_cache.has_media(media_id) or broadcaster.is_hot(media_id)):
+        data = await cached_part(media_id, base, full, fetch)
+        return data[off - base:off - base + cs]
+    return await cached_part(media_id, off, cs, fetch)
+
+async def cached_part(media_id: int, off: int, limit: int, fetch) -> bytes:
+    key = (media_id, off, limit)
+    return await broadcaster.get(key, lambda: chunk_cache.get_or_fetch(key, lambda: fetch(off, limit)))
+
+def prefetch_bytes(lanes: int = 1) -> int:
+    """
+    Read-ahead window bytes mein: config (har client/lane ke liye PREFETCH_WINDOW poore 1 MB parts) aur per-stream memory cap.
+    Parts chhote hon toh zyada parts flight mein rehte hain, isliye seek par throughput kam nahi hota.
+    """
+    full = chunking.MAX_CHUNK
+    return max(full, min(Config.PREFETCH_WINDOW * lanes * full, Config.PREFETCH_MAX_MB * 1024 * 1024))
+
+async def iter_parts(fetch, parts: list, window: int):
+    """
+    `parts` [(offset, limit), ...] ke GetFile requests chalata hai, `window` bytes tak ek saath flight mein,
+    aur parts ko sahi order mein yield karta hai. `fetch(k, offset, limit)` part index bhi leta hai (lanes ke liye).
+    Har part global `stream_budget` se `limit` bytes leta hai aur consumer ke aage badhne par lautata hai;
+    budget bhara ho toh read-ahead ruk jaata hai (backpressure), bas kam se kam ek part chalta rehta hai.
+    Client disconnect hone par (generator close/cancel) bache hue requests cancel ho jaate hain.
+    """
+    pending = collections.deque()
+    nxt = 0
+    held = inflight = 0
+    try:
+        cp = 1
+        while cp <= len(parts):
+            while nxt < len(parts) and (not pending or inflight + parts[nxt][1] <= window):
+                off, limit = parts[nxt]
+                if not pending:
+                    await stream_budget.acquire(limit)
+                elif not stream_budget.try_acquire(limit):
+                    break
+                held += limit
+                inflight += limit
+                pending.append((limit, asyncio.ensure_future(fetch(nxt, off, limit))))
+                nxt += 1
+            limit, task = pending.popleft()
+            chk = await task
+            inflight -= limit
+            if not chk:
+                break
+            yield cp, chk
+            held -= limit
+            stream_budget.release(limit)
+            cp += 1
+    finally:
+        for _, t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*(t for _, t in pending), return_exceptions=True)
+        if held:
+            stream_budget.release(held)
+
+def cut_part(chk: bytes, cp: int, pc: int, fc: int, lc: int):
+    """ Pehle aur aakhri part ko requested range ke hisaab se kaat-ta hai (memoryview: koi copy nahi). """
+    if pc == 1: return memoryview(chk)[fc:lc]
+    if cp == 1: return memoryview(chk)[fc:]
+    if cp == pc: return memoryview(chk)[:lc]
+    return chk
+
+def get_streamer(c: Client) -> ByteStreamer:
+    tc = class_cache.get(c)
+    if tc is None:
+        tc = class_cache[c] = ByteStreamer(c)
+    return tc
+
+def claim_clients(dc_id: int = None):
+    """
+    Stream ke client(s) response banate waqt hi chun kar gin leta hai (striping mode mein STRIPE_CLIENTS tak).
+    Response band hone par `claim.release()` zaroori hai.
+    """
+    n = Config.STRIPE_CLIENTS if len(multi_clients) >= 2 else 1
+    return scheduler.claim(max(1, n), dc_id, exclude={i for i in scheduler.clients if i not in multi_clients})
+
+def open_stream(fid: FileId, claim, start: int, end: int, mid: int, sequential: bool = False):
+    """ Byte range [start, end] ke liye body generator, `claim` ke client(s) se (ek se zyada ho toh striping). """
+    cs = chunking.choose_chunk_size(end - start + 1, sequential, fid.dc_id)
+    parts, fc, lc = ranges.plan_growing_parts(start, end, cs, chunking.MAX_CHUNK)
+    if len(claim.ids) > 1:
+        return yield_file_striped(claim.ids, fid, parts, fc, lc, mid, claim)
+    client_id = claim.ids[0]
+    return get_streamer(multi_clients[client_id]).yield_file(fid, client_id, parts, fc, lc, mid, claim)
+
+async def empty_body():
+    return
+    yield
+
+async def multipart_body(parts: list, closing: bytes, fid: FileId, claim, mid: int):
+    """ multipart/byteranges body: har range ka header, phir uske bytes. """
+    for header, start, end in parts:
+        yield header
+        async for chk in open_stream(fid, claim, start, end, mid):
+            yield chk
+    yield closing
@@ -0,0 +1,89 @@
+# streaming/fanout.py (SHARED PART FAN-OUT FOR CONCURRENT VIEWERS)
+
+import asyncio
+import collections
+from config import Config
+import metrics
+
+class PartBroadcaster:
+    """
+    Ek hi file ko dekh rahe saare viewers ke beech parts share karta hai.
+    - Ek (file, part) ka Telegram fetch ek hi baar hota hai; baaki waiting generators usi ka result paate hain.
+    - Jin files ke ek saath kai viewers hain (hot files), unke haal ke parts ek bounded ring buffer mein rehte hain,
+      taaki thoda peeche chal rahe viewers ko dobara fetch na karna pade.
+    """
+    def __init__(self, max_bytes: int, parts_per_file: int, min_viewers: int):
+        self.max_bytes = max_bytes
+        self.parts_per_file = parts_per_file
+        self.min_viewers = min_viewers
+        self._ring = collections.OrderedDict()  # (media_id, offset, limit) -> bytes
+        self._per_file = collections.Counter()  # media_id -> ring mein kitne parts
+        self._size = 0
+        self._inflight = {}
+        self.viewers = collections.Counter()  # media_id -> active streams
+
+    def joined(self, media_id: int):
+        self.viewers[media_id] += 1
+
+    def left(self, media_id: int):
+        self.viewers[media_id] -= 1
+        if self.viewers[media_id] <= 0:
+            del self.viewers[media_id]
+
+    def is_hot(self, media_id: int) -> bool:
+        return self.viewers.get(media_id, 0) >= self.min_viewers
+
+    def has(self, key) -> bool:
+        """ Part ring mein hai ya abhi fetch ho raha hai. """
+        return key in self._ring or key in self._inflight
+
+    async def get(self, key, fetch) -> bytes:
+        data = self._ring.get(key)
+        if data is not None:
+            self._ring.move_to_end(key)
+            metrics.CACHE_REQUESTS.inc("fanout", "hit")
+            return data
+        task = self._inflight.get(key)
+        if task is None:
+            metrics.CACHE_REQUESTS.inc("fanout", "miss")
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, fetch))
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            metrics.CACHE_REQUESTS.inc("fanout", "shared")
+        # shield: ek viewer chala jaaye toh baaki viewers ka fetch cancel na ho
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        self._inflight.pop(key, None)
+        # Sab viewers ja chuke hon toh error koi nahi padhta; "never retrieved" warning na aaye
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, key, fetch) -> bytes:
+        data = await fetch()
+        if data and self.is_hot(key[0]) and len(data) <= self.max_bytes:
+            self._store(key, data)
+        return data
+
+    def _store(self, key, data: bytes):
+        media_id = key[0]
+        if key in self._ring:
+            return
+        if self._per_file[media_id] >= self.parts_per_file:
+            # Is file ka sabse purana part hatao (ring buffer)
+            oldest = next(k for k in self._ring if k[0] == media_id)
+            self._drop(oldest)
+        self._ring[key] = data
+        self._per_file[media_id] += 1
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            self._drop(next(iter(self._ring)))
+
+    def _drop(self, key):
+        data = self._ring.pop(key)
+        self._size -= len(data)
+        self._per_file[key[0]] -= 1
+        if self._per_file[key[0]] <= 0:
+            del self._per_file[key[0]]
+
+broadcaster = PartBroadcaster(Config.FANOUT_MAX_MB * 1024 * 1024, Config.FANOUT_RING_PARTS, Config.FANOUT_MIN_VIEWERS)
@@ -0,0 +1,58 @@
+# streaming/httpcache.py (HTTP CACHING HEADERS AUR CONDITIONAL REQUESTS)
+
+import time
+import urllib.parse
+from email.utils import formatdate, parsedate_to_datetime
+from config import Config
+
+def http_date(ts: float) -> str:
+    return formatdate(ts, usegmt=True)
+
+def parse_http_date(value: str):
+    """ HTTP date ko unix timestamp mein; galat ho toh None. """
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def etag_matches(header: str, etag: str) -> bool:
+    """ `If-None-Match` ka weak comparison (W/ prefix ignore) ya `*`. """
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in [t.removeprefix("W/") for t in tags]
+
+def not_modified(headers, etag: str, last_modified: float = None) -> bool:
+    """
+    RFC 7232: `If-None-Match` ho toh sirf wahi dekha jaata hai; warna `If-Modified-Since` ko Last-Modified se milaate hain.
+    True matlab 304 bhejo.
+    """
+    inm = headers.get("if-none-match")
+    if inm is not None:
+        return etag_matches(inm, etag)
+    ims = headers.get("if-modified-since")
+    if ims and last_modified:
+        since = parse_http_date(ims)
+        return since is not None and int(last_modified) <= since
+    return False
+
+def content_cache_control(expires: float = None) -> str:
+    """
+    Telegram message ka content kabhi nahi badalta, isliye immutable. Signed link ho toh sirf token expiry tak,
+    taaki expire hua link cache se bhi na chale.
+    """
+    max_age = Config.CONTENT_MAX_AGE
+    if expires:
+        max_age = max(0, min(max_age, int(expires - time.time())))
+    return f"public, max-age={max_age}, immutable"
+
+def content_disposition(name: str, disposition: str = "inline") -> str:
+    """ RFC 6266: ASCII fallback `filename` aur UTF-8 `filename*`, taaki quotes/newlines/Unicode header na todein. """
+    name = name or "file"
+    fallback = "".join(c if 32 <= ord(c) < 127 and c not in '"\\' else "_" for c in name)
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{urllib.parse.quote(name, safe='')}"
+
+def validators(m: dict, etag: str, expires: float = None) -> dict:
+    """ Content responses ke common caching headers. """
+    hdrs = {"ETag": etag, "Cache-Control": content_cache_control(expires)}
+    if m.get("date"):
+        hdrs["Last-Modified"] = http_date(m["date"])
+    return hdrs
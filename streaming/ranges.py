@@ -0,0 +1,114 @@
+# streaming/ranges.py (RFC 7233 RANGE HANDLING)
+
+MAX_RANGES = 16          # isse zyada ranges (coalesce ke baad bhi) aayein toh header ignore karke poori file
+COALESCE_GAP = 80        # itne bytes se kam ka gap ho toh do ranges ko ek hi part mein jod do
+
+def _is_number(s: str) -> bool:
+    # str.isdigit() '²' jaise unicode digits bhi maan leta hai, jin par int() fail hota hai
+    return s.isascii() and s.isdigit()
+
+class RangeNotSatisfiable(Exception):
+    """ Range header sahi hai par koi bhi range file ke andar nahi aati (416). """
+
+def parse_range_header(header: str, size: int):
+    """
+    `Range` header ko [(start, end), ...] (inclusive) mein badalta hai: `a-b`, `a-`, suffix `-n` aur multiple ranges.
+    Overlapping/paas-paas wali ranges coalesce ho jaati hain.
+    Header galat ho ya unit `bytes` na ho toh None (matlab header ignore karke 200 bhejo).
+    Koi range satisfiable na ho toh RangeNotSatisfiable.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+    spans = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        first, dash, last = item.partition("-")
+        first, last = first.strip(), last.strip()
+        if not dash or not (first or last) or (first and not _is_number(first)) or (last and not _is_number(last)):
+            return None
+        if not first:
+            # suffix range: aakhri `n` bytes
+            n = int(last)
+            if n == 0:
+                continue
+            start, end = max(0, size - n), size - 1
+        else:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = min(int(last), size - 1) if last else size - 1
+        if start >= size:
+            continue
+        spans.append((start, end))
+    if not spans:
+        raise RangeNotSatisfiable
+    spans = coalesce(spans)
+    if len(spans) > MAX_RANGES:
+        return None
+    return spans
+
+def coalesce(spans: list, gap: int = COALESCE_GAP) -> list:
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + 1 + gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def plan_parts(start: int, end: int, cs: int):
+    """
+    Byte range [start, end] ke liye GetFile plan: (pehla offset, pehle part ka cut, aakhri part ka cut, part count).
+    Part count range ki lambai se nahi balki chhue gaye chunks se nikalta hai, taaki boundary paar karne wali
+    chhoti ranges bhi poori aayein.
+    """
+    offset = (start // cs) * cs
+    first_cut = start - offset
+    last_cut = (end % cs) + 1
+    part_count = end // cs - start // cs + 1
+    return offset, first_cut, last_cut, part_count
+
+def plan_growing_parts(start: int, end: int, cs: int, max_cs: int):
+    """
+    Byte range [start, end] ke liye GetFile parts [(offset, limit), ...] aur pehle/aakhri part ke cuts.
+    Pehla part `cs` ka hota hai (seek par jaldi pehla byte); uske baad jab offset agle size par aligned ho,
+    size double hota jaata hai `max_cs` tak, taaki lamba read chhote parts mein na atke.
+    Telegram ki shart (offset limit ka multiple, limit 1 MB ko divide kare) har part par bani rehti hai.
+    """
+    offset = (start // cs) * cs
+    parts = []
+    while offset <= end:
+        parts.append((offset, cs))
+        offset += cs
+        if cs < max_cs and offset % (cs * 2) == 0:
+            cs *= 2
+    last_offset, _ = parts[-1]
+    return parts, start - parts[0][0], end - last_offset + 1
+
+def if_range_matches(if_range: str, etag: str, last_modified: str = None) -> bool:
+    """
+    `If-Range` na ho, ya strong ETag match kare, ya (date wala If-Range) Last-Modified ke barabar ho,
+    tabhi Range maana jaayega; warna poori file.
+    """
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        return not if_range.startswith("W/") and if_range == etag
+    return last_modified is not None and if_range == last_modified
+
+def multipart_parts(spans: list, content_type: str, size: int, boundary: str):
+    """ multipart/byteranges ke har part ka header (bytes) aur range, saath mein closing delimiter. """
+    parts = [
+        (f"\r\n--{boundary}\r\nContent-Type: {content_type}\r\nContent-Range: bytes {s}-{e}/{size}\r\n\r\n".encode(), s, e)
+        for s, e in spans
+    ]
+    return parts, f"\r\n--{boundary}--\r\n".encode()
+
+def multipart_length(parts: list, closing: bytes) -> int:
+    return sum(len(h) + e - s + 1 for h, s, e in parts) + len(closing)
@@ -0,0 +1,161 @@
+# streaming/scheduler.py (LOAD-AWARE CLIENT SCHEDULER)
+
+import time
+from pyrogram.errors import FloodWait
+from config import Config
+import metrics
+
+class ClientState:
+    """ Ek client ka live haal: kitne streams/parts chal rahe hain, speed, errors aur FloodWait cooldown. """
+    def __init__(self, client_id: int, dc_id: int = None):
+        self.client_id = client_id
+        self.dc_id = dc_id
+        self.streams = 0
+        self.claimed = 0  # chune gaye streams jinka body abhi shuru nahi hua
+        self.parts = 0
+        self.bytes_total = 0
+        self.throughput = 0.0  # bytes/sec (EWMA)
+        self.error_rate = 0.0  # 0..1 (EWMA)
+        self.flood_until = 0.0
+        self.flood_waits = 0
+        self.failed = None  # start na ho paaye toh error message
+
+    @property
+    def cooling(self) -> bool:
+        return self.flood_until > time.monotonic()
+
+    def cost(self, dc_id: int = None) -> float:
+        load = self.streams + self.claimed + self.parts / max(1, Config.PREFETCH_WINDOW)
+        cost = load * (1 + 4 * self.error_rate)
+        if dc_id is not None and dc_id == self.dc_id:
+            cost -= 0.5  # same DC: cross-DC media session ki zarurat nahi
+        return cost
+
+    def snapshot(self) -> dict:
+        return {
+            "dc_id": self.dc_id,
+            "streams": self.streams,
+            "claimed": self.claimed,
+            "parts_in_flight": self.parts,
+            "bytes_total": self.bytes_total,
+            "throughput_bps": round(self.throughput),
+            "error_rate": round(self.error_rate, 3),
+            "flood_wait_remaining": max(0, round(self.flood_until - time.monotonic(), 1)),
+            "flood_waits": self.flood_waits,
+            "failed": self.failed,
+        }
+
+class StreamClaim:
+    """
+    Response banate waqt hi chune gaye client(s) par stream gin leta hai, taaki ek saath aaye requests
+    ek hi idle client par na jaayein. Lane (PartFetcher) shuru hote hi `consume` se claim asli stream ban jaata hai;
+    jo bacha ho woh `release` (response band hone par) lautata hai.
+    """
+    def __init__(self, scheduler, ids: list):
+        self.scheduler = scheduler
+        self.ids = ids
+        self._pending = list(ids)
+        for i in ids:
+            scheduler.clients[i].claimed += 1
+
+    def consume(self, client_id: int):
+        if client_id in self._pending:
+            self._pending.remove(client_id)
+            self.scheduler.clients[client_id].claimed -= 1
+
+    def release(self):
+        for i in self._pending:
+            self.scheduler.clients[i].claimed -= 1
+        self._pending = []
+
+class ClientScheduler:
+    """
+    Streams ke liye client chunta hai: in-flight load, haal ki speed, error rate, FloodWait cooldown
+    aur file ke DC ko dekh kar. Jo clients start nahi hue ya cooldown mein hain unhe tab tak avoid karta hai.
+    """
+    ALPHA = 0.2  # EWMA smoothing
+
+    def __init__(self):
+        self.clients = {}
+        self._turn = 0  # barabar cost wale clients mein round-robin
+
+    def register(self, client_id: int, dc_id: int = None):
+        self.clients[client_id] = ClientState(client_id, dc_id)
+
+    def mark_failed(self, client_id: int, error):
+        state = self.clients.setdefault(client_id, ClientState(client_id))
+        state.failed = str(error)
+
+    def __bool__(self) -> bool:
+        return any(s.failed is None for s in self.clients.values())
+
+    def _usable(self, exclude=()) -> list:
+        return [s for i, s in self.clients.items() if s.failed is None and i not in exclude]
+
+    def pick(self, dc_id: int = None, exclude=()):
+        """ Sabse sasta (kam load, kam errors, same DC) client id; sab cooldown mein hon toh jo sabse pehle free hoga. """
+        usable = self._usable(exclude)
+        if not usable:
+            return None
+        ready = [s for s in usable if not s.cooling]
+        if not ready:
+            return min(usable, key=lambda s: s.flood_until).client_id
+        ready.sort(key=lambda s: s.client_id)
+        self._turn += 1
+        n = len(ready)
+        best = min(range(n), key=lambda k: (ready[k].cost(dc_id), (k - self._turn) % n))
+        return ready[best].client_id
+
+    def claim(self, n: int = 1, dc_id: int = None, exclude=()):
+        """ Ek stream ke liye client chun kar (striping mein `n` tak) usi waqt gin leta hai. Koi na ho toh None. """
+        first = self.pick(dc_id, exclude)
+        if first is None:
+            return None
+        ids = [first]
+        while len(ids) < n:
+            i = self.pick(dc_id, exclude=set(exclude) | set(ids))
+            if i is None or self.clients[i].cooling:
+                break
+            ids.append(i)
+        return StreamClaim(self, ids)
+
+    # --- Tracking hooks (ByteStreamer inhe call karta hai) ---
+
+    def stream_started(self, client_id: int):
+        self.clients[client_id].streams += 1
+
+    def stream_finished(self, client_id: int):
+        self.clients[client_id].streams -= 1
+
+    async def track(self, client_id: int, fetch) -> bytes:
+        """ Ek part fetch (`fetch()`) ko time karta hai aur us client ki speed/error stats update karta hai. """
+        state = self.clients[client_id]
+        state.parts += 1
+        start = time.monotonic()
+        try:
+            data = await fetch()
+        except Exception as e:
+            state.error_rate += self.ALPHA * (1 - state.error_rate)
+            metrics.GETFILE_ERRORS.inc(client_id, type(e).__name__)
+            if isinstance(e, FloodWait):
+                self.flood_wait(client_id, e.value)
+            raise
+        finally:
+            state.parts -= 1
+        elapsed = max(time.monotonic() - start, 1e-3)
+        state.bytes_total += len(data)
+        metrics.TELEGRAM_BYTES.inc(client_id, amount=len(data))
+        state.throughput += self.ALPHA * (len(data) / elapsed - state.throughput)
+        state.error_rate -= self.ALPHA * state.error_rate
+        return data
+
+    def flood_wait(self, client_id: int, seconds: float):
+        state = self.clients[client_id]
+        state.flood_waits += 1
+        metrics.FLOOD_WAITS.inc(client_id)
+        state.flood_until = max(state.flood_until, time.monotonic() + seconds)
+
+    def snapshot(self) -> dict:
+        return {str(i): s.snapshot() for i, s in sorted(self.clients.items())}
+
+scheduler = ClientScheduler()
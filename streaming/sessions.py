@@ -0,0 +1,103 @@
+# streaming/sessions.py (MEDIA SESSION POOL)
+
+import asyncio
+import random
+from pyrogram import Client, raw
+from pyrogram.errors import AuthBytesInvalid
+from pyrogram.session import Session, Auth
+from config import Config
+
+class MediaSessionPool:
+    """
+    Har (client, DC) ke liye ek media session rakhta hai.
+    Naya session banana har (client, DC) par lock ke andar hota hai, taaki burst mein duplicate sessions na banein.
+    Startup par saare DCs ke sessions pehle se bana leta hai aur background mein dead sessions reconnect karta hai.
+    """
+    DC_IDS = (1, 2, 3, 4, 5)
+
+    def __init__(self):
+        self._locks = {}
+        self._keepalive_task = None
+        self._prewarm_task = None
+
+    async def get(self, c: Client, dc_id: int) -> Session:
+        ms = c.media_sessions.get(dc_id)
+        if ms is not None:
+            return ms
+        lock = self._locks.setdefault((c.name, dc_id), asyncio.Lock())
+        async with lock:
+            ms = c.media_sessions.get(dc_id)
+            if ms is None:
+                ms = await self._create(c, dc_id)
+                c.media_sessions[dc_id] = ms
+        return ms
+
+    @staticmethod
+    async def _create(c: Client, dc_id: int) -> Session:
+        if dc_id == await c.storage.dc_id():
+            return c.session
+        test_mode = await c.storage.test_mode()
+        ms = Session(c, dc_id, await Auth(c, dc_id, test_mode).create(), test_mode, is_media=True)
+        await ms.start()
+        try:
+            for attempt in range(6):
+                ea = await c.invoke(raw.functions.auth.ExportAuthorization(dc_id=dc_id))
+                try:
+                    await ms.invoke(raw.functions.auth.ImportAuthorization(id=ea.id, bytes=ea.bytes))
+                    break
+                except AuthBytesInvalid:
+                    if attempt == 5:
+                        raise
+        except BaseException:
+            await ms.stop()
+            raise
+        return ms
+
+    async def prewarm(self, clients: dict):
+        """ Har client ke liye saare DCs ke media sessions ek saath bana leta hai. """
+        jobs = [(i, dc) for i in clients for dc in self.DC_IDS]
+        results = await asyncio.gather(*(self.get(clients[i], dc) for i, dc in jobs), return_exceptions=True)
+        failed = [(i, dc) for (i, dc), r in zip(jobs, results) if isinstance(r, BaseException)]
+        print(f"✅ Media sessions pre-warmed: {len(jobs) - len(failed)}/{len(jobs)} ready.")
+        for i, dc in failed:
+            print(f"Warning: Client {i} ka DC {dc} session nahi bana.")
+
+    async def check(self, c: Client, dc_id: int):
+        """ Session ko ping karta hai; jawab na aaye toh band karke naya bana deta hai. """
+        ms = c.media_sessions.get(dc_id)
+        if ms is None or ms is c.session:
+            return
+        try:
+            await ms.invoke(raw.functions.Ping(ping_id=random.getrandbits(63)), retries=0, timeout=10)
+        except Exception as e:
+            print(f"Media session {c.name}/DC{dc_id} dead ({e!r}), reconnecting...")
+            async with self._locks.setdefault((c.name, dc_id), asyncio.Lock()):
+                if c.media_sessions.get(dc_id) is ms:
+                    del c.media_sessions[dc_id]
+            try:
+                await ms.stop()
+            except Exception:
+                pass
+            await self.get(c, dc_id)
+
+    async def _keepalive(self, clients: dict):
+        while True:
+            await asyncio.sleep(Config.SESSION_KEEPALIVE)
+            checks = [self.check(c, dc) for c in list(clients.values()) for dc in list(c.media_sessions)]
+            await asyncio.gather(*checks, return_exceptions=True)
+
+    def start(self, clients: dict):
+        """ `clients` (jaise multi_clients) ke liye pre-warm aur keep-alive background mein shuru karta hai. """
+        if Config.SESSION_PREWARM and self._prewarm_task is None:
+            # Reference rakhte hain taaki task beech mein GC na ho aur stop() use cancel kar sake
+            self._prewarm_task = asyncio.create_task(self.prewarm(dict(clients)))
+        if Config.SESSION_KEEPALIVE > 0 and self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive(clients))
+
+    def stop(self):
+        for task in (self._prewarm_task, self._keepalive_task):
+            if task is not None:
+                task.cancel()
+        self._prewarm_task = self._keepalive_task = None
+
+session_pool = MediaSessionPool()
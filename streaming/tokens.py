@@ -0,0 +1,65 @@
+# streaming/tokens.py (SIGNED STREAM URLS)
+
+import hmac
+import json
+import time
+import base64
+import hashlib
+from config import Config
+
+class InvalidToken(Exception):
+    """ Token ka signature galat hai, format toota hai, ya woh expire ho chuka hai. """
+
+def _secret() -> bytes:
+    # STREAM_SECRET na ho toh BOT_TOKEN se nikaalo: har node par same rehta hai aur bahar kisi ko pata nahi
+    if Config.STREAM_SECRET:
+        return Config.STREAM_SECRET.encode()
+    return hashlib.sha256(b"streamix-stream-token:" + Config.BOT_TOKEN.encode()).digest()
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _sign(payload: str) -> str:
+    return _b64(hmac.new(_secret(), payload.encode(), hashlib.sha256).digest()[:16])
+
+def issue(mid: int, meta: dict, ttl: int = None) -> str:
+    """
+    Stream token banata hai jisme woh sab hai jo /stream ko file serve karne ke liye chahiye
+    (message id, file_id, size, mime, dc, unique id, duration, date) aur expiry. Expiry ghante ke hisaab se round hoti hai,
+    taaki ek ghante tak same URL bane aur browser/CDN caches kaam aayein.
+    """
+    ttl = Config.STREAM_TOKEN_TTL if ttl is None else ttl
+    exp = -(-(int(time.time()) + ttl) // 3600) * 3600
+    body = {
+        "m": mid, "f": meta["file_id"], "u": meta["file_unique_id"], "s": meta["file_size"],
+        "t": meta.get("mime_type") or "", "d": meta.get("dc_id"), "e": exp,
+    }
+    if meta.get("duration"):
+        body["l"] = meta["duration"]
+    if meta.get("date"):
+        body["w"] = meta["date"]
+    payload = _b64(json.dumps(body, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+def verify(token: str) -> dict:
+    """ Token check karke file details lautata hai: message_id, file_id, file_unique_id, file_size, mime_type, dc_id, expires. """
+    try:
+        payload, sig = token.split(".", 1)
+    except ValueError:
+        raise InvalidToken("malformed")
+    # bytes compare: str par compare_digest non-ASCII characters mein TypeError deta hai
+    if not hmac.compare_digest(sig.encode(), _sign(payload).encode()):
+        raise InvalidToken("bad signature")
+    try:
+        body = json.loads(_unb64(payload))
+    except ValueError:
+        raise InvalidToken("malformed")
+    if body["e"] < time.time():
+        raise InvalidToken("expired")
+    return {
+        "message_id": body["m"], "file_id": body["f"], "file_unique_id": body["u"], "file_size": body["s"],
+        "mime_type": body["t"] or None, "dc_id": body["d"], "duration": body.get("l"), "date": body.get("w"), "expires": body["e"],
+    }
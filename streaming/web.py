@@ -0,0 +1,461 @@
+# streaming/web.py (STREAMING HTTP ROUTES)
+
+import os
+import re
+import math
+import asyncio
+import time
+import hashlib
+import secrets
+import logging
+import traceback
+from fastapi import APIRouter, Request, HTTPException
+from starlette.requests import ClientDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, Response, HTMLResponse
+from fastapi.templating import Jinja2Templates
+from pyrogram.file_id import FileId
+
+from config import Config
+from database import db
+from cache import chunk_cache, TTLCache
+from cluster import registry
+from ratelimit import stream_limiter, QuotaExceeded
+import metrics
+from .scheduler import scheduler
+from .budget import stream_budget
+from .engine import multi_clients, file_cache, get_file_properties, claim_clients, open_stream, empty_body, multipart_body
+from . import tokens
+from . import httpcache
+from . import ranges
+from . import chunking
+
+# /show, /api/file, /dl, /stream, /seg, /metrics aur /api/clients; app.py aur webserver.py dono isse mount karte hain
+router = APIRouter()
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates"))
+
+# =====================================================================================
+# --- HELPER FUNCTIONS ---
+# =====================================================================================
+
+def get_readable_file_size(size_in_bytes):
+    if not size_in_bytes:
+        return '0B'
+    power = 1024
+    n = 0
+    power_labels = {0: 'B', 1: 'KB', 2: 'MB', 3: 'GB'}
+    while size_in_bytes >= power and n < len(power_labels) - 1:
+        size_in_bytes /= power
+        n += 1
+    return f"{size_in_bytes:.2f} {power_labels[n]}"
+
+def mask_filename(name: str):
+    if not name:
+        return "Protected File"
+    base, ext = os.path.splitext(name)
+    metadata_pattern = re.compile(
+        r'((19|20)\d{2}|4k|2160p|1080p|720p|480p|360p|HEVC|x265|BluRay|WEB-DL|HDRip)',
+        re.IGNORECASE
+    )
+    match = metadata_pattern.search(base)
+    if match:
+        title_part = base[:match.start()].strip(' .-_')
+        metadata_part = base[match.start():]
+    else:
+        title_part = base
+        metadata_part = ""
+    masked_title = ''.join(c if (i % 3 == 0 and c.isalnum()) else ('*' if c.isalnum() else c) for i, c in enumerate(title_part))
+    return f"{masked_title} {metadata_part}{ext}".strip()
+
+# =====================================================================================
+# --- FILE PAGE AUR API ---
+# =====================================================================================
+
+async def build_file_details(unique_id: str) -> dict:
+    """ Link ke page/API ke liye file details. Saved metadata aur caches se; Telegram sirf zarurat par. """
+    if Config.DATABASE_URL and not db.connected:
+        # Startup: database abhi connect ho raha hai, link ko "invalid" mat batao
+        raise HTTPException(status_code=503, detail="Server is starting, please retry.", headers={"Retry-After": "5"})
+    link = await db.get_link_doc(unique_id)
+    if not link:
+        raise HTTPException(status_code=404, detail="Link expired or invalid.")
+    message_id = link['message_id']
+    try:
+        media = file_cache.get(message_id)
+        if media is None and link.get('file_id'):
+            # Upload ke waqt save hui metadata: Telegram ko touch karne ki zarurat nahi
+            media = dict(link, fid=FileId.decode(link['file_id']))
+            file_cache.set(message_id, media)
+        if media is None:
+            main_bot = multi_clients.get(scheduler.pick())
+            if not main_bot:
+                raise HTTPException(status_code=503, detail="Bot is not ready.")
+            media = await get_file_properties(main_bot, message_id)
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Media not found in the message.")
+    except Exception:
+        raise HTTPException(status_code=404, detail="File not found on Telegram.")
+    file_name = media["file_name"] or "file"
+    safe_file_name = "".join(c for c in file_name if c.isalnum() or c in (' ', '.', '_', '-')).rstrip()
+    mime_type = media["mime_type"] or "application/octet-stream"
+    base_url = await registry.stream_base_url(media["fid"].media_id) if Config.ROLE == "bot" else Config.BASE_URL
+    # Signed link: /stream ko har range request par database ya Telegram se kuch nahi poochna padta
+    token = tokens.issue(message_id, media)
+    stream_link = f"{base_url}/stream/{token}/{safe_file_name}"
+    details = {
+        "file_name": mask_filename(file_name),
+        "file_size": get_readable_file_size(media["file_size"]),
+        "is_media": mime_type.startswith(("video", "audio")),
+        "direct_dl_link": stream_link,
+        "mx_player_link": f"intent:{stream_link}#Intent;action=android.intent.action.VIEW;type={mime_type};end",
+        "vlc_player_link": f"intent:{stream_link}#Intent;action=android.intent.action.VIEW;type={mime_type};package=org.videolan.vlc;end"
+    }
+    if Config.SEGMENTS_ENABLED:
+        details["segment_index_link"] = f"{base_url}/seg/{token}/index.json"
+        if mime_type == "video/mp2t" and media.get("duration"):
+            details["hls_link"] = f"{base_url}/seg/{token}/playlist.m3u8"
+    return details
+
+# Template ek hi baar compile hota hai; rendered pages thodi der cache mein (node choice/expiry fresh rahe)
+show_template = templates.env.get_template("show.html")
+page_cache = TTLCache(Config.FILE_CACHE_SIZE, Config.SHOW_CACHE_TTL)
+
+@router.get("/show/{unique_id}", response_class=HTMLResponse)
+async def show_page(request: Request, unique_id: str):
+    """ Poora page server par render hota hai (file details ke saath), browser ko /api/file nahi bulana padta. """
+    page = page_cache.get(unique_id)
+    metrics.CACHE_REQUESTS.inc("show_page", "miss" if page is None else "hit")
+    if page is None:
+        try:
+            context = await build_file_details(unique_id)
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            html = show_template.render(request=request, error="Link expired or invalid")
+            return HTMLResponse(html, status_code=404, headers={"Cache-Control": "no-store"})
+        html = show_template.render(request=request, **context)
+        page = (html, f'"{hashlib.sha1(html.encode()).hexdigest()[:20]}"')
+        page_cache.set(unique_id, page)
+    html, etag = page
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={Config.SHOW_CACHE_TTL}"}
+    inm = request.headers.get("if-none-match")
+    if inm is not None and httpcache.etag_matches(inm, etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(html, headers=headers)
+
+@router.get("/api/file/{unique_id}", response_class=JSONResponse)
+async def get_file_details_api(request: Request, unique_id: str):
+    return await build_file_details(unique_id)
+
+# =====================================================================================
+# --- /dl, /stream AUR /seg ---
+# =====================================================================================
+
+async def throttled_stream(body, lease):
+    """ Har chunk bhejne se pehle global/IP/link bandwidth buckets se ijaazat. """
+    try:
+        async for chk in body:
+            await lease.throttle(len(chk))
+            yield chk
+    finally:
+        lease.release()
+        await body.aclose()
+
+async def instrument_stream(body, started: float):
+    """ /dl body ke around: time-to-first-byte aur active streams metrics. """
+    metrics.ACTIVE_STREAMS.inc()
+    try:
+        first = True
+        async for chk in body:
+            if first:
+                metrics.TTFB_SECONDS.observe(time.perf_counter() - started)
+                first = False
+            yield chk
+    finally:
+        metrics.ACTIVE_STREAMS.dec()
+        await body.aclose()
+
+class IdleStreamEvicted(ClientDisconnect):
+    """ Client ne STREAM_IDLE_TIMEOUT tak data nahi padha: raise karne par server connection band kar deta hai. """
+
+class HideEvictionFilter(logging.Filter):
+    # Eviction ke baad uvicorn connection band karke exception ko error log karta hai; yeh expected hai
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not (record.exc_info and isinstance(record.exc_info[1], IdleStreamEvicted))
+
+logging.getLogger("uvicorn.error").addFilter(HideEvictionFilter())
+
+class BoundedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse jo ruke hue clients ko nikaal deta hai: agar client STREAM_IDLE_TIMEOUT seconds tak
+    data nahi padhta, toh body generator band karke IdleStreamEvicted raise hota hai (server connection band
+    kar deta hai), jisse uska client slot aur buffered parts turant free ho jaate hain.
+    `on_close` response khatam hone par (kaise bhi) chalta hai.
+    """
+    def __init__(self, *args, on_close=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_close = on_close
+
+    async def stream_response(self, send) -> None:
+        timeout = Config.STREAM_IDLE_TIMEOUT or None
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            async for chunk in self.body_iterator:
+                await asyncio.wait_for(send({"type": "http.response.body", "body": chunk, "more_body": True}), timeout)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except asyncio.TimeoutError:
+            metrics.IDLE_EVICTIONS.inc()
+            print(f"Evicting idle stream (no read for {timeout}s).")
+            raise IdleStreamEvicted()
+        finally:
+            await self.body_iterator.aclose()
+            if self.on_close is not None:
+                self.on_close()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """ Prometheus scrape endpoint. """
+    if not Config.METRICS_ENABLED:
+        raise HTTPException(status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/api/clients", response_class=JSONResponse)
+async def clients_status():
+    """ Scheduler ka live haal: har client ka load, speed, errors aur FloodWait cooldown, aur /dl quotas. """
+    return dict(scheduler.snapshot(), quotas=stream_limiter.snapshot())
+
+def client_ip(r: Request) -> str:
+    """ Request karne wale ka IP. Proxy headers sirf TRUST_PROXY_HEADERS par maane jaate hain (warna koi bhi spoof kar de). """
+    if Config.TRUST_PROXY_HEADERS:
+        # Har proxy apne peer ka IP end mein jodta hai; shuru ki entries client khud bhej sakta hai, isliye
+        # right se TRUSTED_PROXY_HOPS-wa entry hi asli client hai
+        hops = [ip.strip() for h in r.headers.getlist("x-forwarded-for") for ip in h.split(",") if ip.strip()]
+        if hops:
+            return hops[-min(Config.TRUSTED_PROXY_HOPS, len(hops))]
+    return r.client.host if r.client else ""
+
+def quota_error(e: QuotaExceeded) -> HTTPException:
+    metrics.QUOTA_REJECTIONS.inc(e.status)
+    return HTTPException(e.status, detail=e.reason, headers={"Retry-After": str(max(1, round(e.retry_after)))})
+
+@router.api_route("/dl/{mid}/{fname}", methods=["GET", "HEAD"])
+async def stream_media(r: Request, mid: int, fname: str):
+    started = time.perf_counter()
+    if Config.SIGNED_STREAMS_ONLY:
+        raise HTTPException(403, detail="Use a signed /stream link.")
+    ip = client_ip(r)
+    try:
+        stream_limiter.check_request(ip)
+    except QuotaExceeded as e:
+        raise quota_error(e)
+    c = multi_clients.get(scheduler.pick())
+    if not c:
+        # Startup abhi chal raha hai: koi client ready nahi
+        raise HTTPException(503, detail="Server is starting, please retry.", headers={"Retry-After": "5"})
+    try:
+        m = await get_file_properties(c, mid)
+    except FileNotFoundError:
+        raise HTTPException(404)
+    except Exception:
+        print(traceback.format_exc())
+        raise HTTPException(500)
+    return await serve_file(r, mid, m, ip, started)
+
+@router.api_route("/stream/{token}/{fname}", methods=["GET", "HEAD"])
+async def stream_signed(r: Request, token: str, fname: str):
+    """
+    Signed link: file ki saari details token mein hain, isliye na database na get_messages,
+    sirf HMAC check aur seedha streaming.
+    """
+    started = time.perf_counter()
+    m = resolve_token(token)
+    ip = client_ip(r)
+    try:
+        stream_limiter.check_request(ip)
+    except QuotaExceeded as e:
+        raise quota_error(e)
+    if not multi_clients:
+        raise HTTPException(503, detail="Server is starting, please retry.", headers={"Retry-After": "5"})
+    return await serve_file(r, m["message_id"], dict(m, file_name=m.get("file_name") or fname), ip, started)
+
+async def serve_file(r: Request, mid: int, m: dict, ip: str, started: float):
+    """ /dl aur /stream ka common hissa: ranges, headers aur (quota ke andar) body. Sirf CPU kaam jab tak body shuru na ho. """
+    fid, fsize = m["fid"], m["file_size"]
+    mime_type = m["mime_type"] or "application/octet-stream"
+    etag = f'"{m["file_unique_id"]}"'
+    cache_hdrs = httpcache.validators(m, etag, m.get("expires"))
+    if httpcache.not_modified(r.headers, etag, m.get("date")):
+        return Response(status_code=304, headers=cache_hdrs)
+    hdrs = {"Accept-Ranges": "bytes", "Content-Disposition": httpcache.content_disposition(m["file_name"]), **cache_hdrs}
+
+    rh = r.headers.get("Range")
+    if rh and not ranges.if_range_matches(r.headers.get("If-Range"), etag, cache_hdrs.get("Last-Modified")):
+        rh = None
+    try:
+        spans = ranges.parse_range_header(rh, fsize)
+    except ranges.RangeNotSatisfiable:
+        raise HTTPException(416, headers={"Content-Range": f"bytes */{fsize}"})
+
+    if spans is None or len(spans) == 1:
+        sc = 206 if spans else 200
+        start, end = spans[0] if spans else (0, fsize - 1)
+        hdrs.update({"Content-Type": mime_type, "Content-Length": str(end - start + 1)})
+        if spans:
+            hdrs["Content-Range"] = f"bytes {start}-{end}/{fsize}"
+        sequential = chunking.is_sequential(ip, mid, start, end)
+        make_body = lambda claim: open_stream(fid, claim, start, end, mid, sequential) if fsize else empty_body()
+    else:
+        sc = 206
+        boundary = secrets.token_hex(12)
+        parts, closing = ranges.multipart_parts(spans, mime_type, fsize, boundary)
+        hdrs.update({"Content-Type": f"multipart/byteranges; boundary={boundary}", "Content-Length": str(ranges.multipart_length(parts, closing))})
+        make_body = lambda claim: multipart_body(parts, closing, fid, claim, mid)
+
+    return await body_response(r, mid, ip, started, sc, hdrs, make_body, fid.dc_id)
+
+async def body_response(r: Request, mid: int, ip: str, started: float, sc: int, hdrs: dict, make_body, dc_id: int = None):
+    """
+    HEAD ho toh sirf headers; warna quota slot aur client(s) le kar `make_body(claim)` ko stream karta hai.
+    Client yahin gina jaata hai (body shuru hone se pehle), taaki ek saath aaye requests alag clients par bantein.
+    """
+    if r.method == "HEAD":
+        # Sirf headers: koi GetFile nahi
+        return Response(status_code=sc, headers=hdrs)
+    try:
+        # Saare client slots bhare hon toh yahan (IPs ke beech round-robin) queue mein rukta hai
+        lease = await stream_limiter.admit(ip, mid, Config.STREAMS_PER_CLIENT * len(multi_clients))
+    except QuotaExceeded as e:
+        raise quota_error(e)
+    claim = claim_clients(dc_id)
+    if claim is None:
+        lease.release()
+        raise HTTPException(503, detail="Server is starting, please retry.", headers={"Retry-After": "5"})
+
+    def on_close():
+        lease.release()
+        claim.release()
+
+    body = throttled_stream(make_body(claim), lease)
+    return BoundedStreamingResponse(instrument_stream(body, started), status_code=sc, headers=hdrs, on_close=on_close)
+
+# --- SEGMENTED DELIVERY ---
+# File ko SEGMENT_MB ke fixed byte segments mein baant kar immutable URLs par dete hain: har segment ka URL
+# kabhi nahi badalta, isliye browser/CDN use hamesha ke liye cache kar sakte hain aur seek par sirf naye
+# segments aate hain. Segments 1 MB GetFile parts par aligned hain, taaki chunk cache ke keys match karein.
+
+def segment_count(size: int) -> int:
+    return max(1, -(-size // Config.SEGMENT_SIZE))
+
+def resolve_token(token: str) -> dict:
+    """ Signed token se file properties (bina DB/Telegram ke); refresh hui file_id file_cache mein ho toh woh. """
+    try:
+        t = tokens.verify(token)
+    except tokens.InvalidToken as e:
+        raise HTTPException(403, detail=f"Invalid stream link ({e}).")
+    cached = file_cache.get(t["message_id"])
+    if cached is not None:
+        return dict(cached, message_id=t["message_id"], expires=t["expires"])
+    return dict(t, fid=FileId.decode(t["file_id"]))
+
+def segments_enabled():
+    if not Config.SEGMENTS_ENABLED:
+        raise HTTPException(404)
+
+@router.get("/seg/{token}/index.json", response_class=JSONResponse)
+async def segment_index(token: str):
+    """ File ke saare segments ki list (size, byte ranges aur URLs). """
+    segments_enabled()
+    m = resolve_token(token)
+    size, seg = m["file_size"], Config.SEGMENT_SIZE
+    segments = [
+        {"index": n, "start": n * seg, "end": min(size, (n + 1) * seg) - 1, "url": f"/seg/{token}/{n}"}
+        for n in range(segment_count(size))
+    ]
+    body = {"file_size": size, "mime_type": m["mime_type"], "segment_size": seg, "segments": segments}
+    if m.get("duration"):
+        body["duration"] = m["duration"]
+    return JSONResponse(body, headers={"Cache-Control": httpcache.content_cache_control(m["expires"])})
+
+@router.get("/seg/{token}/playlist.m3u8")
+async def segment_playlist(token: str):
+    """
+    HLS playlist. Byte segments keyframes par nahi katte, isliye yeh sirf MPEG-TS files par chalta hai
+    (TS packets kahin se bhi decode ho jaate hain); segment ki duration size ke hisaab se andaazi hai.
+    """
+    segments_enabled()
+    m = resolve_token(token)
+    if m["mime_type"] != "video/mp2t" or not m.get("duration"):
+        raise HTTPException(404, detail="HLS playlists are only available for MPEG-TS videos; use index.json instead.")
+    size, seg = m["file_size"], Config.SEGMENT_SIZE
+    durations = [m["duration"] * (min(size, (n + 1) * seg) - n * seg) / size for n in range(segment_count(size))]
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{max(1, math.ceil(max(durations)))}", "#EXT-X-MEDIA-SEQUENCE:0", "#EXT-X-PLAYLIST-TYPE:VOD"]
+    for n, d in enumerate(durations):
+        lines += [f"#EXTINF:{d:.3f},", str(n)]
+    lines.append("#EXT-X-ENDLIST")
+    return Response("\n".join(lines) + "\n", media_type="application/vnd.apple.mpegurl", headers={"Cache-Control": httpcache.content_cache_control(m["expires"])})
+
+@router.api_route("/seg/{token}/{n}", methods=["GET", "HEAD"])
+async def segment_media(r: Request, token: str, n: int):
+    """ Ek segment: poora (ranges nahi), immutable caching ke saath. """
+    started = time.perf_counter()
+    segments_enabled()
+    m = resolve_token(token)
+    ip = client_ip(r)
+    try:
+        stream_limiter.check_request(ip)
+    except QuotaExceeded as e:
+        raise quota_error(e)
+    if not multi_clients:
+        raise HTTPException(503, detail="Server is starting, please retry.", headers={"Retry-After": "5"})
+    fid, size = m["fid"], m["file_size"]
+    if not 0 <= n < segment_count(size) or not size:
+        raise HTTPException(404)
+    start, end = n * Config.SEGMENT_SIZE, min(size, (n + 1) * Config.SEGMENT_SIZE) - 1
+    etag = f'"{m["file_unique_id"]}-{n}"'
+    cache_hdrs = httpcache.validators(m, etag, m["expires"])
+    if httpcache.not_modified(r.headers, etag, m.get("date")):
+        return Response(status_code=304, headers=cache_hdrs)
+    mime_type = "video/mp2t" if m["mime_type"] == "video/mp2t" else "application/octet-stream"
+    key = (fid.media_id, start, end - start + 1)
+    if Config.X_ACCEL_PREFIX:
+        path = chunk_cache.local_path(key)
+        if path is not None:
+            # Segment disk par hai: bytes nginx bhejega, Python sirf headers deta hai
+            metrics.X_ACCEL_BYTES.inc(amount=end - start + 1)
+            return Response(headers={"X-Accel-Redirect": Config.X_ACCEL_PREFIX.rstrip("/") + "/" + path, "Content-Type": mime_type, **cache_hdrs})
+    hdrs = {"Content-Type": mime_type, "Content-Length": str(end - start + 1), **cache_hdrs}
+    mid = m["message_id"]
+    # sequential=True: poore 1 MB parts, segment boundaries par aligned
+    make_body = lambda claim: open_stream(fid, claim, start, end, mid, True)
+    if Config.X_ACCEL_PREFIX and chunk_cache.enabled:
+        make_body = lambda claim: store_segment(open_stream(fid, claim, start, end, mid, True), key)
+    return await body_response(r, mid, ip, started, 200, hdrs, make_body, fid.dc_id)
+
+segment_stores = set()  # jin segments ki copy abhi ban rahi hai
+
+async def store_segment(body, key):
+    """
+    Segment bhejte hue uski copy jodta hai; poora pahunch jaaye toh ek file mein cache, agli baar nginx bhejega.
+    Ek segment ki ek hi copy banti hai aur buffer stream_budget se aata hai; budget bhara ho toh bina copy ke.
+    """
+    size = key[2]
+    if key in segment_stores or chunk_cache.has(key) or not stream_budget.try_acquire(size):
+        try:
+            async for chk in body:
+                yield chk
+        finally:
+            await body.aclose()
+        return
+    segment_stores.add(key)
+    buf = bytearray()
+    try:
+        async for chk in body:
+            buf += chk
+            yield chk
+        if len(buf) == size:
+            await chunk_cache.store(key, bytes(buf))
+    finally:
+        segment_stores.discard(key)
+        stream_budget.release(size)
+        await body.aclose()
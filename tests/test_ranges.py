@@ -0,0 +1,83 @@
+# tests/test_ranges.py (RANGE PARSING AUR PART PLANNING)
+
+import pytest
+from streaming import ranges
+from streaming.ranges import parse_range_header, plan_parts, RangeNotSatisfiable
+
+SIZE = 10_000
+
+def test_no_header_or_other_unit_is_ignored():
+    assert parse_range_header(None, SIZE) is None
+    assert parse_range_header("", SIZE) is None
+    assert parse_range_header("items=0-1", SIZE) is None
+
+def test_single_ranges():
+    assert parse_range_header("bytes=0-99", SIZE) == [(0, 99)]
+    assert parse_range_header("bytes=9000-", SIZE) == [(9000, SIZE - 1)]
+    # file se aage wala end file ke end par kat jaata hai
+    assert parse_range_header("bytes=9000-20000", SIZE) == [(9000, SIZE - 1)]
+
+def test_suffix_ranges():
+    assert parse_range_header("bytes=-500", SIZE) == [(SIZE - 500, SIZE - 1)]
+    assert parse_range_header("bytes=-20000", SIZE) == [(0, SIZE - 1)]
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header("bytes=-0", SIZE)
+
+def test_multiple_ranges_are_sorted_and_coalesced():
+    assert parse_range_header("bytes=5000-5099, 0-99", SIZE) == [(0, 99), (5000, 5099)]
+    # overlap aur COALESCE_GAP se chhota gap: ek hi part
+    assert parse_range_header("bytes=0-99,50-199", SIZE) == [(0, 199)]
+    assert parse_range_header("bytes=0-99,150-199", SIZE) == [(0, 199)]
+    assert parse_range_header("bytes=0-99,1000-1099", SIZE) == [(0, 99), (1000, 1099)]
+
+def test_too_many_ranges_is_ignored():
+    spec = ",".join(f"{n * 1000}-{n * 1000 + 1}" for n in range(ranges.MAX_RANGES + 1))
+    assert parse_range_header(f"bytes={spec}", 100_000) is None
+
+def test_unsatisfiable():
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header(f"bytes={SIZE}-", SIZE)
+    # ek bhi satisfiable range ho toh baaki chhod di jaati hain
+    assert parse_range_header(f"bytes={SIZE}-,0-9", SIZE) == [(0, 9)]
+
+@pytest.mark.parametrize("header", [
+    "bytes=abc", "bytes=1-a", "bytes=-", "bytes=5-1", "bytes=0x10-", "bytes=",
+    "bytes=²-", "bytes=-²", "bytes=١٢-",
+])
+def test_malformed_is_ignored(header):
+    assert parse_range_header(header, SIZE) is None
+
+def test_plan_parts_inside_one_part():
+    assert plan_parts(100, 199, 1024) == (0, 100, 200, 1)
+
+def test_plan_parts_crossing_a_boundary():
+    # 2 bytes, par do parts chhute hain
+    assert plan_parts(1023, 1024, 1024) == (0, 1023, 1, 2)
+
+def test_plan_parts_aligned_range():
+    assert plan_parts(2048, 4095, 1024) == (2048, 0, 1024, 2)
+
+def test_plan_parts_cover_exactly_the_range():
+    cs = 4096
+    for start, end in [(0, 0), (1, 4096), (4095, 8192), (5000, 20000)]:
+        offset, first_cut, last_cut, part_count = plan_parts(start, end, cs)
+        first_byte = offset + first_cut
+        last_byte = offset + (part_count - 1) * cs + last_cut - 1
+        assert (first_byte, last_byte) == (start, end)
+
+def test_growing_parts_double_up_to_max_at_aligned_offsets():
+    K = 1024
+    parts, first_cut, last_cut = ranges.plan_growing_parts(3 * 1024 * K, 6 * 1024 * K - 1, 256 * K, 1024 * K)
+    assert [limit // K for _, limit in parts] == [256, 256, 512, 1024, 1024]
+    assert (first_cut, last_cut) == (0, 1024 * K)
+
+def test_growing_parts_stay_valid_for_getfile():
+    K = 1024
+    for start, end, cs in [(0, 199, 4 * K), (5000, 3_000_000, 4 * K), (1_234_567, 9_999_999, 256 * K)]:
+        parts, first_cut, last_cut = ranges.plan_growing_parts(start, end, cs, 1024 * K)
+        for (offset, limit), (next_offset, _) in zip(parts, parts[1:] + [(None, None)]):
+            assert offset % limit == 0 and (1024 * K) % limit == 0
+            if next_offset is not None:
+                assert next_offset == offset + limit
+        last_offset, _ = parts[-1]
+        assert (parts[0][0] + first_cut, last_offset + last_cut - 1) == (start, end)